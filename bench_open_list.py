@@ -0,0 +1,98 @@
+# bench_open_list.py
+#
+# Vergleicht die Open-List-Implementierungen der A*-Suche mit der
+# ursprünglichen Variante (heapq mit Float-Tupeln direkt in der Schleife):
+#   python bench_open_list.py [max_steps]
+
+import heapq
+import random
+import sys
+import time
+from typing import List, Set, Tuple
+
+from schedule1.calculator import Calculator
+from schedule1.open_list import OPEN_LISTS
+from schedule1.search_engine import SearchEngine
+
+
+def bench_queue(name: str, n: int = 200000) -> float:
+    """Reiner Push/Pop-Durchsatz mit A*-typischen Prioritäten (Vielfache von 0.02)."""
+    rng = random.Random(0)
+    priorities = [-rng.randrange(5000, 15000) / 50 for _ in range(n)]
+    queue = OPEN_LISTS[name](8)
+    start = time.perf_counter()
+    for i, p in enumerate(priorities):
+        queue.push(p, float(i % 8), i % 8, ([i], set()))
+    while queue:
+        queue.pop()
+    return time.perf_counter() - start
+
+
+def bench_queue_baseline(n: int = 200000) -> float:
+    """Wie bench_queue, aber mit (f, g, seq, effects)-Tupeln direkt in heapq."""
+    rng = random.Random(0)
+    priorities = [-rng.randrange(5000, 15000) / 50 for _ in range(n)]
+    heap: list = []
+    start = time.perf_counter()
+    for i, p in enumerate(priorities):
+        heapq.heappush(heap, (p, float(i % 8), [i], set()))
+    while heap:
+        heapq.heappop(heap)
+    return time.perf_counter() - start
+
+
+def baseline_find_sequence(calc: Calculator, max_steps: int, base: str = "Meth"):
+    """
+    Ursprüngliche A*-Schleife (Profit-Modus, ohne Constraints) als Referenz:
+    Float-Tupel (f, g, seq, effects) in heapq, geschlossene Menge über
+    (Effekte, Tiefe).
+    """
+    ingredients = list(calc.INGREDIENT_PRICES.keys())
+    yields_only = sorted(
+        (calc.calculate_sale_price(list(calc.apply_item(set(), item)), base)
+         - calc.INGREDIENT_PRICES[item] for item in ingredients),
+        reverse=True)
+
+    open_list: List[Tuple[float, float, List[str], Set[str]]] = [(0.0, 0.0, [], set())]
+    closed: Set[Tuple[frozenset, int]] = set()
+    while open_list:
+        f, g_neg, seq, effects = heapq.heappop(open_list)
+        depth = len(seq)
+        if depth == max_steps:
+            return seq
+        state = (frozenset(effects), depth)
+        if state in closed:
+            continue
+        closed.add(state)
+        for item in ingredients:
+            new_seq = seq + [item]
+            new_eff = calc.apply_item(effects, item)
+            prof = (calc.calculate_sale_price(list(new_eff), base)
+                    - calc.calculate_cost(new_seq))
+            steps_left = max_steps - len(new_seq)
+            h = sum(yields_only[:steps_left]) if steps_left > 0 else 0.0
+            heapq.heappush(open_list, (-(prof + h), -prof, new_seq, new_eff))
+    return []
+
+
+def bench_search(name: str, max_steps: int) -> float:
+    search = SearchEngine(Calculator())
+    start = time.perf_counter()
+    search.find_sequence([], max_steps=max_steps, timeout=600, open_list=name)
+    return time.perf_counter() - start
+
+
+def bench_search_baseline(max_steps: int) -> float:
+    calc = Calculator()
+    start = time.perf_counter()
+    baseline_find_sequence(calc, max_steps)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    max_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    print(f"{'original':>8}: queue {bench_queue_baseline():.3f}s, "
+          f"find_sequence({max_steps}) {bench_search_baseline(max_steps):.3f}s")
+    for name in OPEN_LISTS:
+        print(f"{name:>8}: queue {bench_queue(name):.3f}s, "
+              f"find_sequence({max_steps}) {bench_search(name, max_steps):.3f}s")
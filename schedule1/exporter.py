@@ -0,0 +1,266 @@
+# schedule1/exporter.py
+
+import array
+import json
+import os
+import shutil
+import struct
+import sys
+import zlib
+from typing import List, Optional, Dict, Iterator
+
+from .calculator import Calculator
+from .search_engine import SearchEngine
+
+MAGIC = b"S1CAT\x01"
+CHUNK_MAGIC = b"CHNK"
+_CHUNK_HEADER = struct.Struct("<4sII")   # Magic, Zeilen, Payload-Länge
+_LENGTH = struct.Struct("<I")
+
+# Spalten eines Chunks in Schreibreihenfolge: (Name, array-Typcode)
+# Die Sequenz-Spalte ist variabel lang (depth Bytes je Zeile) und folgt zuletzt.
+_COLUMNS = [
+    ("depth", "B"),        # Anzahl Schritte
+    ("effects", "Q"),      # Bitmaske über header["effects"]
+    ("multiplier", "H"),   # Summe der Multiplikatoren in Hundertsteln
+    ("cost", "I"),         # Kosten in Cent
+    ("addiction", "H"),
+]
+
+
+class CatalogueExporter:
+    """
+    Exportiert den Katalog aller erreichbaren Mischungen in eine kompakte,
+    spaltenweise Binärdatei.
+
+    Je (Effekt-Zustand, Tiefe) wird eine Zeile mit Effekten, Multiplikator,
+    billigster Sequenz, Kosten, Addiction und Profit je Basisprodukt
+    geschrieben. Die Zeilen werden in Chunks fester Größe gepuffert,
+    zlib-komprimiert angehängt und nach jedem Chunk in einem Checkpoint
+    vermerkt, sodass ein abgebrochener Export fortgesetzt werden kann.
+    """
+
+    def __init__(self, calculator: Calculator, search_engine: Optional[SearchEngine] = None):
+        self.calc = calculator
+        self.search = search_engine or SearchEngine(calculator)
+
+        # Dieselbe Nummerierung wie die Bitmasken der Suche
+        index, _ = self.search.effect_masks()
+        if len(index) > 64:
+            raise ValueError(
+                f"{len(index)} Effekte passen nicht in die 64-Bit-Effektspalte")
+        self.effects: List[str] = sorted(index, key=index.get)
+        self.ingredients: List[str] = list(self.calc.INGREDIENT_PRICES)
+        self.bases: List[str] = list(self.calc.BASE_PRICES)
+
+    def iter_rows(
+        self,
+        max_depth: int,
+        allowed_ingredients: Optional[List[str]] = None,
+        max_states_in_memory: Optional[int] = None,
+        tmp_dir: Optional[str] = None,
+        skip: int = 0,
+        work_dir: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Liefert eine Zeile (Dict) je erreichbarem (Zustand, Tiefe).
+        max_states_in_memory, tmp_dir, skip und work_dir siehe
+        SearchEngine.iter_reachable_states.
+        """
+        for depth, effects, seq in self.search.iter_reachable_states(
+                max_depth, allowed_ingredients, max_states_in_memory, tmp_dir,
+                skip, work_dir):
+            cost = self.calc.calculate_cost(seq)
+            yield {
+                "depth": depth,
+                "effects": effects,
+                "multiplier": sum(self.calc.EFFECT_MULTIPLIERS.get(e, 0.0)
+                                  for e in effects),
+                "sequence": seq,
+                "cost": cost,
+                "addiction": self.calc.calculate_addiction(seq),
+                "profit": {
+                    base: self.calc.calculate_profit(effects, cost, base)
+                    for base in self.bases
+                },
+            }
+
+    def export(
+        self,
+        path: str,
+        max_depth: int,
+        allowed_ingredients: Optional[List[str]] = None,
+        chunk_size: int = 65536,
+        resume: bool = True,
+        max_states_in_memory: Optional[int] = 200000
+    ) -> int:
+        """
+        Schreibt den Katalog bis max_depth nach path und gibt die Anzahl
+        geschriebener Zeilen zurück.
+
+        :param chunk_size: Zeilen pro Chunk; begrenzt den Schreibpuffer.
+        :param resume: Vorhandenen Checkpoint (path + ".ckpt") nutzen und
+            nach dem letzten vollständigen Chunk weiterschreiben.
+        :param max_states_in_memory: Obergrenze für die Zustände, die bei
+            der Aufzählung gleichzeitig im Speicher liegen; größere Tiefen
+            werden in path + ".layers" auf Platte ausgelagert. None hält jede
+            Tiefe komplett im Speicher.
+
+        Beim Fortsetzen wird nicht neu aufgezählt: die ausgelagerten Tiefen
+        bleiben bis zum Ende des Exports liegen, die Aufzählung setzt bei
+        der letzten vollständigen Tiefe vor dem Checkpoint an.
+        """
+        header = {
+            "effects": self.effects,
+            "ingredients": self.ingredients,
+            "bases": self.bases,
+            "max_depth": max_depth,
+            "allowed_ingredients": allowed_ingredients or [],
+            "chunk_size": chunk_size,
+        }
+        checkpoint_path = path + ".ckpt"
+        work_dir = path + ".layers"
+        checkpoint = self._load_checkpoint(checkpoint_path, header) if resume else None
+
+        if checkpoint is None:
+            # Ausgelagerte Tiefen eines anderen Exports nicht weiterverwenden
+            shutil.rmtree(work_dir, ignore_errors=True)
+            f = open(path, "wb")
+            encoded = json.dumps(header).encode("utf-8")
+            f.write(MAGIC + _LENGTH.pack(len(encoded)) + encoded)
+            rows_written = 0
+            self._save_checkpoint(f, checkpoint_path, header, rows_written)
+        else:
+            f = open(path, "r+b")
+            # Alles nach dem letzten bestätigten Chunk verwerfen
+            f.seek(checkpoint["offset"])
+            f.truncate()
+            rows_written = checkpoint["rows"]
+
+        with f:
+            # Bereits geschriebene Zeilen überspringt die Aufzählung selbst
+            # (Reihenfolge ist deterministisch)
+            rows = self.iter_rows(
+                max_depth, allowed_ingredients, max_states_in_memory,
+                skip=rows_written, work_dir=work_dir)
+            buffer: List[Dict] = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= chunk_size:
+                    rows_written += self._write_chunk(f, buffer)
+                    self._save_checkpoint(f, checkpoint_path, header, rows_written)
+                    buffer = []
+            if buffer:
+                rows_written += self._write_chunk(f, buffer)
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return rows_written
+
+    def _write_chunk(self, f, rows: List[Dict]) -> int:
+        """Kodiert rows spaltenweise, komprimiert und hängt sie an f an."""
+        effect_bits = {name: 1 << i for i, name in enumerate(self.effects)}
+        ingredient_ids = {name: i for i, name in enumerate(self.ingredients)}
+
+        columns = {name: array.array(code) for name, code in _COLUMNS}
+        profits = array.array("i")
+        sequences = array.array("B")
+        for row in rows:
+            columns["depth"].append(row["depth"])
+            columns["effects"].append(sum(effect_bits[e] for e in row["effects"]))
+            columns["multiplier"].append(round(row["multiplier"] * 100))
+            columns["cost"].append(round(row["cost"] * 100))
+            columns["addiction"].append(row["addiction"])
+            profits.extend(round(row["profit"][b] * 100) for b in self.bases)
+            sequences.extend(ingredient_ids[i] for i in row["sequence"])
+
+        parts = [columns[name] for name, _ in _COLUMNS] + [profits, sequences]
+        payload = b"".join(_to_little_endian(col) for col in parts)
+        compressed = zlib.compress(payload)
+        f.write(_CHUNK_HEADER.pack(CHUNK_MAGIC, len(rows), len(compressed)))
+        f.write(compressed)
+        return len(rows)
+
+    def _save_checkpoint(self, f, checkpoint_path: str, header: Dict, rows: int):
+        """Sichert Datei-Offset und Zeilenzahl nach einem vollständigen Chunk."""
+        f.flush()
+        os.fsync(f.fileno())
+        tmp = checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as cf:
+            json.dump({"header": header, "rows": rows, "offset": f.tell()}, cf)
+        os.replace(tmp, checkpoint_path)
+
+    def _load_checkpoint(self, checkpoint_path: str, header: Dict) -> Optional[Dict]:
+        """Liest einen Checkpoint, sofern er zu denselben Export-Parametern gehört."""
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path, encoding="utf-8") as cf:
+            checkpoint = json.load(cf)
+        if checkpoint.get("header") != header:
+            return None
+        return checkpoint
+
+
+def read_catalogue(path: str) -> Iterator[Dict]:
+    """
+    Liest eine mit CatalogueExporter geschriebene Datei chunkweise und
+    liefert dieselben Zeilen-Dicts wie CatalogueExporter.iter_rows.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Keine Katalog-Datei: {path}")
+        (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+        header = json.loads(f.read(length).decode("utf-8"))
+        effects, ingredients, bases = header["effects"], header["ingredients"], header["bases"]
+
+        while True:
+            raw = f.read(_CHUNK_HEADER.size)
+            if not raw:
+                break
+            magic, n_rows, size = _CHUNK_HEADER.unpack(raw)
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Beschädigter Chunk in {path}")
+            payload = zlib.decompress(f.read(size))
+
+            columns = {}
+            pos = 0
+            for name, code in _COLUMNS:
+                columns[name], pos = _from_little_endian(code, payload, pos, n_rows)
+            profits, pos = _from_little_endian("i", payload, pos, n_rows * len(bases))
+            sequences = payload[pos:]
+
+            seq_pos = 0
+            for r in range(n_rows):
+                depth = columns["depth"][r]
+                mask = columns["effects"][r]
+                seq_ids = sequences[seq_pos:seq_pos + depth]
+                seq_pos += depth
+                yield {
+                    "depth": depth,
+                    "effects": [e for i, e in enumerate(effects) if mask >> i & 1],
+                    "multiplier": columns["multiplier"][r] / 100,
+                    "sequence": [ingredients[i] for i in seq_ids],
+                    "cost": columns["cost"][r] / 100,
+                    "addiction": columns["addiction"][r],
+                    "profit": {
+                        base: profits[r * len(bases) + b] / 100
+                        for b, base in enumerate(bases)
+                    },
+                }
+
+
+def _to_little_endian(column: array.array) -> bytes:
+    if sys.byteorder == "big":
+        column = array.array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_little_endian(code: str, payload: bytes, pos: int, count: int):
+    column = array.array(code)
+    end = pos + column.itemsize * count
+    column.frombytes(payload[pos:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, end
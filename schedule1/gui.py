@@ -10,6 +10,11 @@ from schedule1.calculator    import Calculator
 from schedule1.search_engine import SearchEngine
 from multiprocessing import Process, Queue
 from typing import Dict
+
+# Die Suche prüft Timeout/Abbruch nur in Abständen; so lange darf sie nach
+# Ablauf des Timeouts noch ihr Ergebnis abliefern, bevor sie beendet wird
+TIMEOUT_GRACE = 1.0
+
 def run_search_process(
     search_engine,
     desired_effects,
@@ -21,12 +26,16 @@ def run_search_process(
     timeout,
     enable_profiling,
     result_queue,
-    progress_queue
+    progress_queue,
+    mode="astar"
 ):
     """
     Führt für jede Tiefe eine einzelne A*-Suche durch,
     pusht Zwischenergebnisse in progress_queue und
     liefert am Ende das beste Ergebnis + Profiling in result_queue.
+    Mit mode="mitm" wird die Meet-in-the-Middle-Suche verwendet; ob deren
+    Ergebnis bewiesen optimal oder nach Timeout nur heuristisch ist, wird
+    je Tiefe mitgemeldet.
     """
     start = time.time()
     best_profit = float("-inf")
@@ -35,6 +44,8 @@ def run_search_process(
     best_cost = 0.0
     # Dict zum Speichern der Laufzeiten pro Tiefe
     times: Dict[int, float] = {}
+    # Alle Tiefen exakt gelöst?
+    all_exact = True
     # Profiler nur bei Bedarf anlegen
     if enable_profiling:
         profiler = cProfile.Profile()
@@ -46,6 +57,7 @@ def run_search_process(
     for depth in range(min_steps, max_steps + 1):
         elapsed = time.time() - start
         if elapsed >= timeout:
+            all_exact = False
             break
         remaining = timeout - elapsed
         # Zeitmessung für diese Tiefe starten
@@ -60,11 +72,14 @@ def run_search_process(
             max_steps=depth,
             allowed_ingredients=allowed_ingredients,
             timeout=remaining,
-            abort_callback=lambda: False
+            abort_callback=lambda: False,
+            mode=mode
         )
+        exact = search_engine.last_result_exact
+        all_exact = all_exact and exact
 
         # Zwischenergebnis + Rest-Timeout melden
-        progress_queue.put((depth, profit, seq, remaining))
+        progress_queue.put((depth, profit, seq, remaining, exact))
         # Laufzeit dieser Tiefe messen und melden
         depth_time = time.time() - deph_start
         times[depth] = depth_time
@@ -101,6 +116,8 @@ def run_search_process(
     else:
         ratios = {}
     result_queue.put(ratios)
+    # 5) Ob alle Tiefen exakt gelöst wurden
+    result_queue.put(all_exact)
 
 # GUI-Klasse für Schedule1
 class Schedule1App:
@@ -201,6 +218,16 @@ class Schedule1App:
         )
         self.profile_chk.pack(side=LEFT, padx=5)
 
+        # Meet-in-the-Middle-Toggle (bei Timeout nur heuristisches Ergebnis;
+        # exakt in 30 s bis etwa 8 Schritte)
+        self.mitm_var = BooleanVar(value=False)
+        self.mitm_chk = Checkbutton(
+            self.control_frame,
+            text="Meet-in-the-Middle",
+            variable=self.mitm_var
+        )
+        self.mitm_chk.pack(side=LEFT, padx=5)
+
         # Größenänderungs-Button (einmal erstellen)
         self.resize_btn = tb.Button(
             self.control_frame,
@@ -297,6 +324,7 @@ class Schedule1App:
         self.timer.configure(amounttotal=timeout, amountused=timeout)
 
         # Suche per eigenem Prozess starten
+        self.search_mode = "mitm" if self.mitm_var.get() else "astar"
         self.search_start = time.time()
         self.find_btn.configure(state="disabled")
         self.cancel_btn.configure(state="normal")
@@ -317,7 +345,8 @@ class Schedule1App:
                 timeout,
                 self.profile_var.get(), # enable_profiling
                 self.result_queue,
-                self.progress_queue
+                self.progress_queue,
+                self.search_mode
             ),
             daemon=True
         )
@@ -357,14 +386,16 @@ class Schedule1App:
         # 0) Alle Zwischenergebnisse aus progress_queue lesen und ins Log schreiben
         while not self.progress_queue.empty():
             # zuerst das Ergebnis, dann die Laufzeit
-            depth, profit, seq, remaining = self.progress_queue.get()
+            depth, profit, seq, remaining, exact = self.progress_queue.get()
             depth_time = self.progress_queue.get()
             # Meter aktualisieren
             self.progress.configure(amountused=depth)
+            # MITM-Ergebnisse nach Timeout sind nicht bewiesen optimal
+            status = " [heuristisch]" if self.search_mode == "mitm" and not exact else ""
             self.log_txt.insert(
                 END,
                 f"Tiefe {depth}: profit={profit:.2f}, seq={seq}, "
-                f"remaining={remaining:.2f}s, time={depth_time:.3f}s\n"
+                f"remaining={remaining:.2f}s, time={depth_time:.3f}s{status}\n"
             )
             self.log_txt.see(END)
 
@@ -373,8 +404,9 @@ class Schedule1App:
         remaining = max(0.0, float(self.timeout_sb.get()) - elapsed)
         self.timer.configure(amountused=remaining)
 
-        # 2) Solange der Prozess noch läuft und Zeit übrig ist, erneut planen
-        if self.search_process.is_alive() and remaining > 0:
+        # 2) Solange der Prozess noch läuft und Zeit (plus Nachfrist) übrig ist, erneut planen
+        overdue = elapsed - float(self.timeout_sb.get())
+        if self.search_process.is_alive() and overdue < TIMEOUT_GRACE:
             self.root.after(100, self._update_meter)
             return
 
@@ -389,6 +421,7 @@ class Schedule1App:
             profiling_output = self.result_queue.get()
             times            = self.result_queue.get()
             ratios           = self.result_queue.get()
+            all_exact        = self.result_queue.get()
 
             # Ergebnis auch im Haupt-Panel anzeigen
             self.result_txt.delete("1.0", END)
@@ -399,6 +432,12 @@ class Schedule1App:
                 f"Kosten:        ${best_cost:.2f}\n"
                 f"Profit:        ${best_profit:.2f}\n"
             )
+            if self.search_mode == "mitm":
+                self.result_txt.insert(
+                    END,
+                    "Status:        "
+                    + ("optimal\n" if all_exact else "heuristisch (Timeout)\n")
+                )
 
             # Profiling nur anzeigen, wenn aktiviert
             if profiling_output:
@@ -0,0 +1,137 @@
+# schedule1/open_list.py
+
+import heapq
+from typing import Any, List, Optional, Tuple
+
+# Zutatenpreise sind ganze Dollar, Multiplikatoren Vielfache von 0.02 und
+# Basispreise ganze Dollar -> Basispreis * Multiplikator ist ein Vielfaches
+# von 0.02. Mit Faktor 50 werden alle A*-Prioritäten exakt ganzzahlig.
+PRIORITY_SCALE = 50
+
+# Größte unterstützte Sequenzlänge + 1 (GUI erlaubt max. 15 Schritte)
+DEPTH_SLOTS = 64
+
+
+def scale_priority(value: float) -> int:
+    """Rechnet eine A*-Priorität in die ganzzahlige Darstellung um."""
+    return round(value * PRIORITY_SCALE)
+
+
+def _check_depth_slots(depth_slots: int):
+    if not 0 < depth_slots <= DEPTH_SLOTS:
+        raise ValueError(f"depth_slots muss in 1..{DEPTH_SLOTS} liegen")
+
+
+class HeapOpenList:
+    """
+    Open-List auf Basis von heapq, wie die ursprüngliche A*-Suche.
+
+    Einträge werden flach als (f, g, *Element) abgelegt: bei gleichem f
+    entscheidet g, danach das Element selbst (zuerst die Sequenz). Damit
+    liefert die Suche genau die Ergebnisse der ursprünglichen
+    Implementierung, ohne zusätzliche langlebige Tupel je Eintrag.
+    Standard in find_sequence.
+    """
+
+    def __init__(self, depth_slots: int = DEPTH_SLOTS):
+        # Die Tiefe geht nicht in den Schlüssel ein -> keine Obergrenze
+        self._heap: List[Tuple[float, float, Any]] = []
+
+    def push(self, f: float, g: float, depth: int, item: tuple):
+        heapq.heappush(self._heap, (f, g, *item))
+
+    def pop(self) -> tuple:
+        return heapq.heappop(self._heap)[2:]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class BucketOpenList:
+    """
+    Bucket-Queue für ganzzahlige Prioritäten.
+
+    Die Prioritäten einer Suche liegen in einem beschränkten Bereich (Preise
+    und Kosten sind endlich), daher gibt es je skalierter Priorität einen
+    Slot in einer Liste, indiziert mit priority - _low. Die Liste wächst bei
+    Bedarf an beiden Enden. _cursor zeigt auf den kleinsten möglicherweise
+    belegten Slot; pop läuft von dort vorwärts. Da A*-Prioritäten hier
+    nicht monoton steigen, setzt ein Push unterhalb des Cursors ihn zurück.
+
+    Ein Slot ist eine feste Liste mit einer Liste je Tiefe; bei Gleichstand
+    gewinnt die tiefere Sequenz, innerhalb einer Tiefe der zuletzt
+    eingefügte Eintrag. _tops merkt sich je Slot die größte
+    möglicherweise belegte Tiefe.
+    """
+
+    def __init__(self, depth_slots: int = DEPTH_SLOTS):
+        _check_depth_slots(depth_slots)
+        self._depth_slots = depth_slots
+        self._slots: List[Optional[List[List[Any]]]] = []
+        self._tops: List[int] = []
+        self._low = 0
+        self._cursor = 0
+        self._size = 0
+
+    def push(self, f: float, g: float, depth: int, item: Any):
+        if not 0 <= depth < self._depth_slots:
+            raise ValueError(f"Tiefe {depth} außerhalb von 0..{self._depth_slots - 1}")
+        priority = scale_priority(f)
+        if not self._slots:
+            self._slots.append(None)
+            self._tops.append(-1)
+            self._low = priority
+            self._cursor = 0
+        index = priority - self._low
+        if index < 0:
+            self._slots[:0] = [None] * -index
+            self._tops[:0] = [-1] * -index
+            self._low = priority
+            self._cursor -= index
+            index = 0
+        elif index >= len(self._slots):
+            grow = index + 1 - len(self._slots)
+            self._slots.extend([None] * grow)
+            self._tops.extend([-1] * grow)
+
+        slot = self._slots[index]
+        if slot is None:
+            slot = self._slots[index] = [[] for _ in range(self._depth_slots)]
+        slot[depth].append(item)
+        if depth > self._tops[index]:
+            self._tops[index] = depth
+        if index < self._cursor:
+            self._cursor = index
+        self._size += 1
+
+    def pop(self) -> Any:
+        if not self._size:
+            raise IndexError("pop from empty BucketOpenList")
+        slots = self._slots
+        cursor = self._cursor
+        while slots[cursor] is None:
+            cursor += 1
+        self._cursor = cursor
+
+        slot = slots[cursor]
+        depth = self._tops[cursor]
+        while not slot[depth]:
+            depth -= 1
+        item = slot[depth].pop()
+        self._size -= 1
+        # Leere Slots freigeben, damit pop sie ohne Suche überspringt
+        while depth >= 0 and not slot[depth]:
+            depth -= 1
+        if depth < 0:
+            slots[cursor] = None
+        self._tops[cursor] = depth
+        return item
+
+    def __len__(self) -> int:
+        return self._size
+
+
+OPEN_LISTS = {
+    "heap": HeapOpenList,
+    "bucket": BucketOpenList,
+}
@@ -1,10 +1,46 @@
 # schedule1/search_engine.py
 
-import time
+import contextlib
 import heapq
-from typing import List, Tuple, Optional, Callable, Set, Dict
+import json
+import math
+import os
+import struct
+import tempfile
+import time
+from typing import List, Tuple, Optional, Callable, Set, Dict, Union, Iterator
 
 from .calculator import Calculator
+from .open_list import DEPTH_SLOTS, OPEN_LISTS
+
+
+class _SearchAborted(Exception):
+    """Interner Abbruch (Timeout oder abort_callback) der MITM-Suche."""
+
+
+def _apply_mask(mask: int, rule: Tuple[int, List[Tuple[int, int]]]) -> int:
+    """Calculator.apply_item auf Bitmasken (siehe SearchEngine.effect_masks)."""
+    bit, replacements = rule
+    if not mask & bit and bin(mask).count("1") < 8:
+        mask |= bit
+    for old, new in replacements:
+        if mask & old:
+            mask = (mask & ~old) | new
+    return mask
+
+
+def _read_records(
+    path: str, fmt: struct.Struct, block: int = 4096, start: int = 0
+) -> Iterator[tuple]:
+    """Liest Datensätze fester Größe blockweise aus einer Datei, ab Datensatz start."""
+    with open(path, "rb") as f:
+        f.seek(start * fmt.size)
+        while True:
+            data = f.read(fmt.size * block)
+            if not data:
+                break
+            yield from fmt.iter_unpack(data)
+
 
 class SearchEngine:
     """
@@ -15,6 +51,8 @@ class SearchEngine:
 
     def __init__(self, calculator: Calculator):
         self.calc = calculator
+        # True, wenn das letzte Ergebnis nachweislich optimal ist (siehe find_sequence)
+        self.last_result_exact: bool = False
 
     def find_sequence(
         self,
@@ -25,7 +63,15 @@ class SearchEngine:
         max_steps: int = 5,
         allowed_ingredients: Optional[List[str]] = None,
         timeout: float = 30.0,
-        abort_callback: Optional[Callable[[], bool]] = None
+        abort_callback: Optional[Callable[[], bool]] = None,
+        min_addiction: Optional[int] = None,
+        max_addiction: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        max_uses_per_ingredient: Optional[Union[int, Dict[str, int]]] = None,
+        required_effects: Optional[List[str]] = None,
+        forbidden_effects: Optional[List[str]] = None,
+        mode: str = "astar",
+        open_list: str = "heap"
     ) -> Tuple[List[str], List[str], float, float]:
         """
         Führt eine A*-Suche durch und gibt die beste Sequenz zurück:
@@ -38,19 +84,51 @@ class SearchEngine:
         :param allowed_ingredients: Wenn gesetzt, reguliert die erlaubten Zutaten.
         :param timeout: Maximale Laufzeit in Sekunden (global).
         :param abort_callback: Funktion, die bei True die Suche abbricht.
+        :param min_addiction: Harte Untergrenze für die Addiction der Sequenz.
+        :param max_addiction: Harte Obergrenze für die Addiction der Sequenz.
+        :param max_cost: Harte Obergrenze für die Zutatenkosten der Sequenz.
+        :param max_uses_per_ingredient: Maximale Verwendungen je Zutat
+            (int für alle Zutaten oder Dict Zutat -> Anzahl).
+        :param required_effects: Effekte, die das Endprodukt haben muss.
+        :param forbidden_effects: Effekte, die das Endprodukt nicht haben darf.
+        :param mode: "astar" (Standard) oder "mitm" für die
+            Meet-in-the-Middle-Suche bei langen Sequenzen. Die MITM-Suche
+            ist nur exakt, wenn sie vor Timeout/Abbruch fertig wird (beim
+            Standard-Timeout bis etwa 8 Schritte); sonst liefert sie die
+            beste bis dahin gefundene (heuristische) Sequenz.
+            Ob das Ergebnis bewiesen optimal ist, steht danach in
+            self.last_result_exact (bei A* immer False).
+        :param open_list: Open-List der A*-Suche (siehe schedule1.open_list):
+            "heap" (Standard, Reihenfolge der ursprünglichen Suche) oder
+            "bucket" (ganzzahlige Prioritäten, bei Gleichstand tiefere
+            Sequenzen zuerst). A* unterstützt höchstens
+            DEPTH_SLOTS - 1 Schritte, sonst ValueError.
         :return: (seq, final_effects, total_cost, total_profit)
+
+        Die Constraints werden bereits beim Expandieren geprüft: Knoten, die
+        die Grenzen selbst im günstigsten Fall nicht mehr einhalten können,
+        landen gar nicht erst in der Open-List. Kosten, Addiction und
+        Verwendungen werden im Queue-Element mitgeführt; ohne
+        Ressourcen-Constraints gilt die einfache geschlossene Menge über
+        (Effekte, Tiefe), sonst eine Pareto-Front der Ressourcen je Zustand.
         """
         start = time.time()
         abort_callback = abort_callback or (lambda: False)
 
-        # Zutatenliste vorbereiten
-        if allowed_ingredients and len(allowed_ingredients) > 0:
-            # Nur erlaubte Zutaten verwenden, die auch im Calculator existieren
-            ingredients = [ing for ing in allowed_ingredients 
-                        if ing in self.calc.INGREDIENT_PRICES]
-        else:
-            # Wenn keine Zutaten gewählt wurden, alle verfügbaren verwenden
-            ingredients = list(self.calc.INGREDIENT_PRICES.keys())
+        ingredients = self._prepare_ingredients(allowed_ingredients)
+        limits = self._build_limits(
+            ingredients, max_steps, min_addiction, max_addiction, max_cost,
+            max_uses_per_ingredient, required_effects, forbidden_effects
+        )
+        self.last_result_exact = False
+        if not limits["satisfiable"] or max_steps > limits["max_total_uses"]:
+            self.last_result_exact = True
+            return [], [], 0.0, float("-inf")
+        if mode == "mitm":
+            return self._find_sequence_mitm(
+                desired_effects, optimize_for, base, max_steps,
+                ingredients, limits, start, timeout, abort_callback
+            )
 
         # Einzel-Ertrag für Heuristik berechnen
         profit_yields: List[Tuple[float,str]] = []
@@ -61,34 +139,52 @@ class SearchEngine:
             profit_yields.append((sale - cost, item))
         profit_yields.sort(key=lambda x: x[0], reverse=True)
         yields_only = [p for p,_ in profit_yields]
+        # h je Restschrittzahl vorab, statt pro Kind neu zu summieren
+        heuristic = [sum(yields_only[:k]) for k in range(max_steps + 1)]
 
         # A*-Priority-Queue initialisieren
-        # Eintrag: (f = -(prof + h), g_neg=-prof, seq, effects_set)
-        open_list: List[Tuple[float,float,List[str],Set[str]]] = [
-            (0.0, 0.0, [], set())
-        ]
+        # Schlüssel: f = -(prof + h), g = -prof (bzw. Kosten), Tiefe,
+        # Element: (seq, effects_set, (Kosten, Addiction, Verwendungen))
+        if open_list not in OPEN_LISTS:
+            raise ValueError(f"Unbekannte Open-List: {open_list}")
+        if max_steps >= DEPTH_SLOTS:
+            raise ValueError(f"max_steps muss kleiner als {DEPTH_SLOTS} sein")
+        queue = OPEN_LISTS[open_list](max_steps + 1)
+        queue.push(0.0, 0.0, 0, ([], set(), self._initial_resources(limits)))
+        constrained = limits["constrained"]
+        prices = self.calc.INGREDIENT_PRICES
+        # Ohne Ressourcen-Constraints: (Effekte, Tiefe) wird nur einmal expandiert.
+        # Mit Constraints: (Effekte, Tiefe) -> Pareto-Front der Ressourcen
         closed: Set[Tuple[frozenset,int]] = set()
+        fronts: Dict[Tuple[frozenset,int], List[tuple]] = {}
+        transitions: Dict[frozenset, Dict[str, tuple]] = {}
+        # Effekt-Constraints: Kinder, die sie nicht mehr erfüllen können, verwerfen
+        pruning = self._effect_pruning(ingredients, max_steps, limits)
+        index = pruning["index"] if pruning is not None else {}
 
         best_seq: List[str] = []
         best_eff: List[str] = []
         best_profit: float = float("-inf")
         best_cost: float = 0.0
 
-        while open_list:
+        while queue:
             # globaler Abbruch?
             if abort_callback():
                 break
             if time.time() - start > timeout:
                 break
 
-            f, g_neg, seq, effects = heapq.heappop(open_list)
-            current_profit = -g_neg
+            seq, effects, resources = queue.pop()
             depth = len(seq)
 
             # Zieltest: tiefe erreicht
             if depth == max_steps:
+                # Beim Expandieren wird nur verworfen, was sicher scheitert;
+                # die Effekt-Constraints selbst werden am Ziel geprüft
+                if not self._effects_allowed(limits, effects):
+                    continue
                 total_sale = self.calc.calculate_sale_price(list(effects), base)
-                total_cost = self.calc.calculate_cost(seq)
+                total_cost = resources[0]
                 total_profit = total_sale - total_cost
                 
                 # Prüfe, ob diese Lösung besser ist als die bisherige
@@ -104,26 +200,57 @@ class SearchEngine:
                 break
 
             state = (frozenset(effects), depth)
-            if state in closed:
-                continue
-            closed.add(state)
+            if not constrained:
+                if state in closed:
+                    continue
+                closed.add(state)
+            else:
+                # Die Zulässigkeit hängt auch vom Pfad ab: ein Knoten wird nur
+                # verworfen, wenn ein bereits expandierter Knoten desselben
+                # Zustands auf jeder Achse mindestens so gut ist
+                key = self._resource_key(limits, resources, max_steps - depth)
+                front = fronts.setdefault(state, [])
+                if any(self._dominates(limits, known, key) for known in front):
+                    continue
+                front[:] = [known for known in front
+                            if not self._dominates(limits, key, known)]
+                front.append(key)
+
+            # Mit Constraints wird derselbe Effekt-Zustand mehrfach expandiert
+            # (andere Ressourcen, andere Tiefe); Übergänge werden dann geteilt
+            children = transitions.setdefault(state[0], {}) if constrained else None
 
             # expandieren
+            steps_left = max_steps - depth - 1
             for item in ingredients:
+                if constrained:
+                    new_res = self._step_resources(limits, resources, item, steps_left)
+                    if new_res is None:
+                        continue
+                else:
+                    new_res = (resources[0] + prices[item], 0, ())
                 new_seq = seq + [item]
-                new_eff = self.calc.apply_item(effects, item)
-                cost = self.calc.calculate_cost(new_seq)
-                sale = self.calc.calculate_sale_price(list(new_eff), base)
-                prof = sale - cost
+                cost = new_res[0]
 
-                steps_left = max_steps - len(new_seq)
-                
-                # Bonus für gewünschte Effekte
-                effect_bonus = 0.0
-                if desired_effects:
-                    # Zähle, wie viele der gewünschten Effekte enthalten sind
-                    matched_effects = sum(1 for e in desired_effects if e in new_eff)
-                    effect_bonus = matched_effects * 10.0  # Bonus pro gefundenem Effekt
+                child = children.get(item) if children is not None else None
+                if child is None:
+                    new_eff = self.calc.apply_item(effects, item)
+                    sale = self.calc.calculate_sale_price(list(new_eff), base)
+                    # Bonus für gewünschte Effekte
+                    effect_bonus = 0.0
+                    if desired_effects:
+                        # Zähle, wie viele der gewünschten Effekte enthalten sind
+                        matched_effects = sum(1 for e in desired_effects if e in new_eff)
+                        effect_bonus = matched_effects * 10.0  # Bonus pro gefundenem Effekt
+                    mask = sum(1 << index[e] for e in new_eff) if pruning is not None else 0
+                    if children is not None:
+                        children[item] = (new_eff, sale, effect_bonus, mask)
+                else:
+                    new_eff, sale, effect_bonus, mask = child
+                if pruning is not None and not self._effects_possible(
+                        pruning, mask, steps_left):
+                    continue
+                prof = sale - cost
                 
                 if optimize_for == "cost":
                     # Bei "cost" optimieren wir auf minimale Kosten
@@ -132,11 +259,11 @@ class SearchEngine:
                     g_new = cost
                 else:  # "profit" (default)
                     # Bei "profit" optimieren wir auf maximalen Profit 
-                    h = sum(yields_only[:steps_left]) if steps_left > 0 else 0.0
+                    h = heuristic[steps_left]
                     f_new = -(prof + h + effect_bonus)  # Mit Bonus für Effekte
                     g_new = -(prof + effect_bonus)
-                
-                heapq.heappush(open_list, (f_new, g_new, new_seq, new_eff))
+
+                queue.push(f_new, g_new, len(new_seq), (new_seq, new_eff, new_res))
 
         return best_seq, best_eff, best_cost, best_profit
     
@@ -149,11 +276,22 @@ class SearchEngine:
         max_steps: int,
         allowed_ingredients: Optional[List[str]],
         timeout: float,
-        abort_callback: Optional[Callable[[], bool]] = None
+        abort_callback: Optional[Callable[[], bool]] = None,
+        min_addiction: Optional[int] = None,
+        max_addiction: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        max_uses_per_ingredient: Optional[Union[int, Dict[str, int]]] = None,
+        required_effects: Optional[List[str]] = None,
+        forbidden_effects: Optional[List[str]] = None,
+        mode: str = "astar",
+        open_list: str = "heap"
     ) -> Tuple[List[str], List[str], float, float]:
         """
         Führt find_sequence für jede Tiefe von min_steps bis max_steps aus
         und liefert das profitabelste Ergebnis.
+        Constraints, mode und open_list werden unverändert an find_sequence
+        durchgereicht. self.last_result_exact ist nur True, wenn jede Tiefe
+        exakt gelöst wurde.
         """
         start = time.time()
         abort = abort_callback or (lambda: False)
@@ -162,12 +300,15 @@ class SearchEngine:
         best_seq: List[str] = []
         best_eff: List[str] = []
         best_cost = 0.0
+        exact = True
 
         for depth in range(min_steps, max_steps + 1):
             if abort():
+                exact = False
                 break
             elapsed = time.time() - start
             if elapsed >= timeout:
+                exact = False
                 break
             remaining = timeout - elapsed
 
@@ -179,8 +320,17 @@ class SearchEngine:
                 max_steps=depth,
                 allowed_ingredients=allowed_ingredients,
                 timeout=remaining,
-                abort_callback=abort
+                abort_callback=abort,
+                min_addiction=min_addiction,
+                max_addiction=max_addiction,
+                max_cost=max_cost,
+                max_uses_per_ingredient=max_uses_per_ingredient,
+                required_effects=required_effects,
+                forbidden_effects=forbidden_effects,
+                mode=mode,
+                open_list=open_list
             )
+            exact = exact and self.last_result_exact
 
             if seq:
                 if optimize_for == "cost" and (best_seq == [] or cost < best_cost):
@@ -190,4 +340,875 @@ class SearchEngine:
                     best_profit, best_cost = profit, cost
                     best_seq, best_eff = seq, eff
 
-        return best_seq, best_eff, best_cost, best_profit
\ No newline at end of file
+        self.last_result_exact = exact
+        return best_seq, best_eff, best_cost, best_profit
+
+    def iter_reachable_states(
+        self,
+        max_depth: int,
+        allowed_ingredients: Optional[List[str]] = None,
+        max_states_in_memory: Optional[int] = None,
+        tmp_dir: Optional[str] = None,
+        skip: int = 0,
+        work_dir: Optional[str] = None
+    ) -> Iterator[Tuple[int, List[str], List[str]]]:
+        """
+        Zählt alle erreichbaren Effekt-Zustände Tiefe für Tiefe auf und
+        liefert je (Zustand, Tiefe) die billigste Sequenz als
+        (depth, effects, seq). Bei gleichen Kosten gewinnt die geringere
+        Addiction, danach die zuerst gefundene Sequenz.
+
+        Innerhalb einer Tiefe kommen die Zustände aufsteigend nach ihrer
+        Bitmaske (siehe effect_masks); die Reihenfolge ist deterministisch.
+
+        :param max_states_in_memory: None hält jeweils eine ganze Tiefe im
+            Speicher (schnell, wächst aber mit der Tiefe: ~1 Mio. Zustände
+            bei Tiefe 8). Mit einer Zahl werden die Tiefen auf Platte
+            ausgelagert: Nachfolger werden in sortierten Runs dieser Größe
+            geschrieben und per Merge nach Bitmaske dedupliziert, sodass
+            der Speicherbedarf unabhängig von der Tiefe begrenzt ist.
+            Beide Varianten liefern identische Zeilen.
+        :param tmp_dir: Verzeichnis, in dem das temporäre Arbeitsverzeichnis
+            der ausgelagerten Dateien angelegt wird.
+        :param skip: Die ersten skip Zustände werden übersprungen, ohne
+            Zeilen für sie zu bauen (zum Fortsetzen eines Exports).
+        :param work_dir: Statt eines temporären Verzeichnisses ein festes
+            Arbeitsverzeichnis für die Auslagerung. Es bleibt nach einem
+            Abbruch erhalten; ein späterer Aufruf mit demselben work_dir
+            setzt bei der letzten vollständigen Tiefe an, statt von vorn
+            aufzuzählen. Aufräumen ist Sache des Aufrufers.
+        """
+        ingredients = self._prepare_ingredients(allowed_ingredients)
+        index, rules = self.effect_masks()
+        names = sorted(index, key=index.get)
+
+        def effects_of(mask: int) -> List[str]:
+            return [name for i, name in enumerate(names) if mask >> i & 1]
+
+        if max_states_in_memory is not None:
+            for depth, mask, seq in self._iter_layers_on_disk(
+                    max_depth, ingredients, rules,
+                    max_states_in_memory, tmp_dir, skip, work_dir):
+                yield depth, effects_of(mask), seq
+            return
+
+        prices = self.calc.INGREDIENT_PRICES
+        levels = self.calc.ADDICTION_LEVELS
+        layer: Dict[int, Tuple[float, int, tuple]] = {0: (0.0, 0, ())}
+        for depth in range(1, max_depth + 1):
+            next_layer: Dict[int, Tuple[float, int, tuple]] = {}
+            for mask in sorted(layer):
+                cost, addiction, seq = layer[mask]
+                for item in ingredients:
+                    nxt = _apply_mask(mask, rules[item])
+                    entry = (cost + prices[item],
+                             addiction + levels.get(item, 0),
+                             seq + (item,))
+                    known = next_layer.get(nxt)
+                    if known is None or entry[:2] < known[:2]:
+                        next_layer[nxt] = entry
+            layer = next_layer
+            if skip >= len(layer):
+                skip -= len(layer)
+                continue
+            for mask in sorted(layer)[skip:]:
+                yield depth, effects_of(mask), list(layer[mask][2])
+            skip = 0
+
+    def effect_masks(self) -> Tuple[Dict[str, int], Dict[str, Tuple[int, List[Tuple[int, int]]]]]:
+        """
+        Nummeriert alle vorkommenden Effekte und übersetzt die Regeln aus
+        items_data in Bitmasken: Zutat -> (Default-Bit, [(alt, neu), ...]).
+
+        :return: (index, rules); index bildet Effektnamen auf ihre
+            Bitposition ab. Die Nummerierung ist alphabetisch und damit
+            stabil, solange sich die Effekte in items_data nicht ändern; die
+            Bitmasken der Suche und die Effektspalte des Katalogs
+            (schedule1.exporter) beruhen darauf.
+        """
+        names: Set[str] = set()
+        for info in self.calc.items_data.values():
+            names.add(info["base_effect"])
+            for old, new in info.get("replacements", []):
+                names.update((old, new))
+        index = {name: i for i, name in enumerate(sorted(names))}
+        rules = {
+            item: (
+                1 << index[info["base_effect"]],
+                [(1 << index[old], 1 << index[new])
+                 for old, new in info.get("replacements", [])]
+            )
+            for item, info in self.calc.items_data.items()
+        }
+        return index, rules
+
+    def _iter_layers_on_disk(
+        self,
+        max_depth: int,
+        ingredients: List[str],
+        rules: Dict[str, Tuple[int, List[Tuple[int, int]]]],
+        max_states_in_memory: int,
+        tmp_dir: Optional[str],
+        skip: int = 0,
+        work_dir: Optional[str] = None
+    ) -> Iterator[Tuple[int, int, List[str]]]:
+        """
+        Externe Variante von iter_reachable_states: liefert (depth, mask, seq).
+
+        Eine Tiefe liegt als Datei mit (Maske, Kosten in Cent, Addiction,
+        Sequenz) aufsteigend nach Maske vor. Für die nächste Tiefe werden
+        die Nachfolger mit Ordnungsnummer (Rang des Vorgängers, Zutat)
+        gepuffert, als sortierte Runs geschrieben und per heapq.merge
+        zusammengeführt; der erste Eintrag je Maske ist der billigste.
+
+        Fertige Tiefen werden erst nach dem Schreiben umbenannt und in
+        layers.json mit der Nummer ihres ersten Zustands vermerkt; die
+        vorletzte wird danach gelöscht. Mit skip beginnt die Aufzählung bei
+        der letzten fertigen Tiefe, die noch vor skip anfängt: deren Rest
+        wird direkt aus der Datei gelesen, die folgenden Tiefen werden neu
+        berechnet.
+        """
+        prices = [round(self.calc.INGREDIENT_PRICES[i] * 100) for i in ingredients]
+        levels = [self.calc.ADDICTION_LEVELS.get(i, 0) for i in ingredients]
+        n_items = len(ingredients)
+
+        def layer_fmt(depth: int) -> struct.Struct:
+            return struct.Struct(f"<QIH{depth}s")
+
+        with contextlib.ExitStack() as stack:
+            if work_dir is None:
+                work = stack.enter_context(tempfile.TemporaryDirectory(dir=tmp_dir))
+            else:
+                work = work_dir
+                os.makedirs(work, exist_ok=True)
+            state_path = os.path.join(work, "layers.json")
+
+            def layer_path(depth: int) -> str:
+                return os.path.join(work, f"layer-{depth}")
+
+            # Tiefe -> Nummer ihres ersten Zustands, nur vollständige Dateien
+            first_rows: Dict[int, int] = {}
+            if os.path.exists(state_path):
+                with open(state_path, encoding="utf-8") as sf:
+                    state = json.load(sf)
+                if state.get("ingredients") == ingredients:
+                    first_rows = {int(d): row for d, row in state["layers"].items()
+                                  if os.path.exists(layer_path(int(d)))}
+
+            def save_state():
+                tmp = state_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as sf:
+                    json.dump({"ingredients": ingredients, "layers": first_rows}, sf)
+                os.replace(tmp, state_path)
+
+            if 0 not in first_rows:
+                with open(layer_path(0), "wb") as f:
+                    f.write(layer_fmt(0).pack(0, 0, 0, b""))
+                first_rows[0] = 0
+                save_state()
+
+            # Einstieg: letzte fertige Tiefe, die vor skip beginnt
+            start = max(d for d, row in first_rows.items()
+                        if row <= skip and d <= max_depth)
+            position = first_rows[start]
+            if start > 0:
+                fmt = layer_fmt(start)
+                count = os.path.getsize(layer_path(start)) // fmt.size
+                offset = min(skip - position, count)
+                for mask, _, _, seq in _read_records(layer_path(start), fmt, start=offset):
+                    yield start, mask, [ingredients[k] for k in seq]
+                position += count
+
+            for depth in range(start + 1, max_depth + 1):
+                parent_fmt = layer_fmt(depth - 1)
+                run_fmt = struct.Struct(f"<QIHQ{depth}s")
+                out_fmt = layer_fmt(depth)
+
+                runs: List[str] = []
+                buffer: List[tuple] = []
+
+                def flush():
+                    buffer.sort()
+                    run_path = os.path.join(work, f"run-{depth}-{len(runs)}")
+                    with open(run_path, "wb") as rf:
+                        for record in buffer:
+                            rf.write(run_fmt.pack(*record))
+                    runs.append(run_path)
+                    buffer.clear()
+
+                parents = _read_records(layer_path(depth - 1), parent_fmt)
+                for rank, (mask, cost, addiction, seq) in enumerate(parents):
+                    for j, item in enumerate(ingredients):
+                        buffer.append((
+                            _apply_mask(mask, rules[item]),
+                            cost + prices[j],
+                            addiction + levels[j],
+                            rank * n_items + j,
+                            seq + bytes((j,)),
+                        ))
+                        if len(buffer) >= max_states_in_memory:
+                            flush()
+                if buffer:
+                    flush()
+
+                first_row = position
+                partial = layer_path(depth) + ".part"
+                merged = heapq.merge(*(_read_records(r, run_fmt) for r in runs))
+                with open(partial, "wb") as out:
+                    last = None
+                    for mask, cost, addiction, _, seq in merged:
+                        if mask == last:
+                            continue
+                        last = mask
+                        out.write(out_fmt.pack(mask, cost, addiction, seq))
+                        if position >= skip:
+                            yield depth, mask, [ingredients[k] for k in seq]
+                        position += 1
+
+                for run_path in runs:
+                    os.remove(run_path)
+                os.replace(partial, layer_path(depth))
+                first_rows[depth] = first_row
+                save_state()
+                # Die Vorgänger-Tiefe wird zum Fortsetzen nicht mehr gebraucht
+                del first_rows[depth - 1]
+                save_state()
+                os.remove(layer_path(depth - 1))
+
+    def _find_sequence_mitm(
+        self,
+        desired_effects: List[str],
+        optimize_for: str,
+        base: str,
+        max_steps: int,
+        ingredients: List[str],
+        limits: Dict,
+        start: float,
+        timeout: float,
+        abort_callback: Callable[[], bool]
+    ) -> Tuple[List[str], List[str], float, float]:
+        """
+        Meet-in-the-Middle-Suche über exakt max_steps Schritte.
+
+        Vorwärts werden alle unterschiedlichen Effekt-Zustände nach
+        ceil(max_steps/2) Schritten mit ihrem billigsten Präfix aufgezählt.
+        Für jeden dieser Zustände wird der beste Suffix über die restlichen
+        Schritte per memoisierter Tabelle (Zustand, Restschritte) berechnet
+        und mit dem Präfix verbunden. Da ein Suffix nur vom Effekt-Zustand
+        abhängt, teilen sich viele Präfixe dieselben Tabelleneinträge.
+
+        Zustände und ihre Nachfolger werden nach einer optimistischen
+        Schranke sortiert abgearbeitet, Teilbäume unterhalb der besten
+        bekannten Lösung werden abgeschnitten. Läuft die Suche vollständig
+        durch, ist das Ergebnis exakt optimal; bei Timeout/Abbruch wird die
+        beste bis dahin gefundene Sequenz geliefert.
+
+        Reichweite des Beweises: ohne Constraints etwa 9 s für 8 Schritte
+        und knapp eine Minute für 9. Die Zahl der Zustände wächst danach
+        schneller, als die Schranke abschneidet (rund 6,5 Mio. nach 10
+        Schritten); ab 10 Schritten bleibt es in der Praxis bei der
+        heuristischen Lösung.
+
+        Bewertet wird wie in der A*-Suche: Profit (bzw. negative Kosten)
+        plus 10 je erreichtem gewünschten Effekt.
+        """
+        prices = self.calc.INGREDIENT_PRICES
+        base_price = self.calc.BASE_PRICES[base]
+        constrained = limits["constrained"]
+
+        prefix_steps = math.ceil(max_steps / 2)
+        suffix_steps = max_steps - prefix_steps
+
+        # Effekt-Zustände als Bitmasken: Calculator.apply_item auf Bits
+        # abgebildet, damit Übergänge und Memo-Schlüssel billig bleiben
+        index, rules = self.effect_masks()
+        multipliers = [self.calc.EFFECT_MULTIPLIERS.get(e, 0.0) for e in index]
+        desired_bits = [1 << index[e] for e in desired_effects or [] if e in index]
+        max_bonus = 10.0 * len(desired_bits)
+        required_mask = sum(1 << index[e] for e in limits["required"])
+        forbidden_mask = sum(1 << index[e] for e in limits["forbidden"]
+                             if e in index)
+
+        def step(mask: int, item: str) -> int:
+            return _apply_mask(mask, rules[item])
+
+        def bits(mask: int) -> List[int]:
+            present = []
+            while mask:
+                low = mask & -mask
+                present.append(low.bit_length() - 1)
+                mask ^= low
+            return present
+
+        def byte_sums(weights: List[float]) -> List[Tuple[int, List[float]]]:
+            """Summen der Gewichte je 8 Bits vorab, statt Bit für Bit."""
+            tables = []
+            for shift in range(0, len(weights), 8):
+                table = [0.0] * 256
+                for byte in range(1, 256):
+                    lowest = byte & -byte
+                    i = shift + lowest.bit_length() - 1
+                    table[byte] = table[byte ^ lowest] + (weights[i] if i < len(weights) else 0.0)
+                tables.append((shift, table))
+            return tables
+
+        def mask_sum(tables: List[Tuple[int, List[float]]], mask: int) -> float:
+            total = 0.0
+            for shift, table in tables:
+                total += table[(mask >> shift) & 255]
+            return total
+
+        multiplier_sums = byte_sums(multipliers)
+
+        def value(mask: int) -> float:
+            bonus = sum(10.0 for bit in desired_bits if mask & bit) if desired_bits else 0.0
+            if optimize_for == "cost":
+                return bonus
+            return base_price * (1 + mask_sum(multiplier_sums, mask)) + bonus
+
+        def terminal(mask: int) -> float:
+            if mask & required_mask != required_mask or mask & forbidden_mask:
+                return float("-inf")
+            return value(mask)
+
+        # Schranke: pro Schritt kommt höchstens ein neuer Effekt hinzu,
+        # insgesamt sind höchstens 8 Effekte möglich (siehe _reach_tables)
+        reach, new_best = self._reach_tables(ingredients, rules, multipliers, max_steps)
+        pruning = self._effect_pruning(ingredients, max_steps, limits)
+        reach_sums = [byte_sums(row) for row in reach]
+        new_sums = [sum(new_best[:r]) for r in range(max_steps + 1)]
+
+        def upper_bound(mask: int, r: int) -> float:
+            if r == 0:
+                return terminal(mask)
+            if pruning is not None and not self._effects_possible(pruning, mask, r):
+                return float("-inf")
+            bound = max_bonus - r * limits["min_price"]
+            if optimize_for == "cost":
+                return bound
+            if bin(mask).count("1") + r <= 8:
+                # Alle Kandidaten passen in die 8 Effekte
+                return base_price * (1 + mask_sum(reach_sums[r], mask) + new_sums[r]) + bound
+            values = sorted([reach[r][i] for i in bits(mask)] + new_best[:r],
+                            reverse=True)
+            return base_price * (1 + sum(values[:8])) + bound
+
+        def next_resources(resources: tuple, item: str, steps_left: int):
+            """Ressourcen nach item oder None, falls ein Constraint verletzt wird."""
+            if not constrained:
+                return resources
+            return self._step_resources(limits, resources, item, steps_left)
+
+        work = [0]
+
+        def check_abort(amount: int = 1):
+            """Prüft Timeout/Abbruch etwa alle 1024 Einheiten Arbeit."""
+            work[0] += amount
+            if work[0] >= 1024:
+                work[0] = 0
+                if abort_callback() or time.time() - start > timeout:
+                    raise _SearchAborted()
+
+        # Memo: (Zustand, Restschritte, Ressourcen) -> (Wert, exakt, Suffix).
+        # Nicht exakte Einträge sind obere Schranken aus einem Fail-Low.
+        memo: Dict[tuple, Tuple[float, bool, tuple]] = {}
+
+        # Zutaten nach Preis: bei gleichem Wert gewinnt die billigere
+        by_price = sorted(
+            ((item, prices[item], rules[item]) for item in ingredients),
+            key=lambda entry: entry[1]
+        )
+
+        def memo_key(mask: int, r: int, resources: tuple) -> tuple:
+            return (mask, r,
+                    self._resource_key(limits, resources, r) if constrained else ())
+
+        def best_suffix(mask: int, r: int, resources: tuple, alpha: float, key: tuple):
+            """
+            Bester Suffix der Länge r ab mask. Der Aufrufer garantiert, dass
+            die Schranke des Zustands über alpha liegt.
+            """
+            hit = memo.get(key)
+            if hit is not None and (hit[1] or hit[0] <= alpha):
+                return hit
+            check_abort()
+
+            best_val, best_seq = float("-inf"), ()
+            if r == 1:
+                # Letzter Schritt: die Kinder sind Endzustände, exakt bewertbar
+                for item, price, rule in by_price:
+                    if constrained and next_resources(resources, item, 0) is None:
+                        continue
+                    val = terminal(_apply_mask(mask, rule)) - price
+                    if val > best_val:
+                        best_val, best_seq = val, (item,)
+                result = (best_val, True, best_seq)
+                memo[key] = result
+                return result
+
+            # Kinder nach Schranke sortieren: gute Suffixe zuerst heben alpha
+            # früh an, der Rest fällt dann ohne Rekursion weg. Bekannte
+            # Memo-Einträge sind engere Schranken (oder exakt).
+            children = []
+            for item, price, rule in by_price:
+                new_res = next_resources(resources, item, r - 1)
+                if new_res is None:
+                    continue
+                child = _apply_mask(mask, rule)
+                child_key = memo_key(child, r - 1, new_res)
+                known = memo.get(child_key)
+                bound = known[0] if known is not None else upper_bound(child, r - 1)
+                children.append((bound - price, len(children), child, item, price,
+                                 new_res, child_key))
+            children.sort(key=lambda c: (-c[0], c[1]))
+
+            ceiling = float("-inf")
+            for bound, _, child, item, price, new_res, child_key in children:
+                if bound <= max(alpha, best_val):
+                    # Alle weiteren Kinder liegen höchstens hier
+                    ceiling = max(ceiling, bound)
+                    break
+                val, exact, seq = best_suffix(
+                    child, r - 1, new_res, max(alpha, best_val) + price, child_key
+                )
+                val -= price
+                if not exact:
+                    ceiling = max(ceiling, val)
+                elif val > best_val:
+                    best_val, best_seq = val, (item,) + seq
+
+            if ceiling <= best_val:
+                result = (best_val, True, best_seq)
+            else:
+                result = (ceiling, False, ())
+            memo[key] = result
+            return result
+
+        def beam_seed(width: int):
+            """Schnelle Startlösung per Beam-Suche nach aktuellem Wert."""
+            beam = [(0, (), 0.0, initial)]
+            for depth in range(1, max_steps + 1):
+                scored = []
+                for mask, seq, cost, res in beam:
+                    check_abort(len(ingredients))
+                    for item in ingredients:
+                        new_res = next_resources(res, item, max_steps - depth)
+                        if new_res is None:
+                            continue
+                        nxt = step(mask, item)
+                        if pruning is not None and not self._effects_possible(
+                                pruning, nxt, max_steps - depth):
+                            continue
+                        new_cost = cost + prices[item]
+                        # Effekt-Constraints erst am Ende hart prüfen
+                        score = terminal(nxt) if depth == max_steps else value(nxt)
+                        scored.append((score - new_cost, len(scored),
+                                       nxt, seq + (item,), new_cost, new_res))
+                scored.sort(key=lambda s: (-s[0], s[1]))
+                beam = [entry[2:] for entry in scored[:width]]
+            results = [(terminal(m) - c, sq) for m, sq, c, _ in beam]
+            return max(results, key=lambda r: r[0], default=(float("-inf"), None))
+
+        def evaluate(seq: tuple) -> float:
+            res = initial
+            mask, cost = 0, 0.0
+            for depth, item in enumerate(seq, 1):
+                res = next_resources(res, item, max_steps - depth)
+                if res is None:
+                    return float("-inf")
+                mask = step(mask, item)
+                cost += prices[item]
+            return terminal(mask) - cost
+
+        def local_search():
+            """Verbessert die beste bekannte Lösung durch Tauschen/Verschieben von Zutaten."""
+            nonlocal best_val, best
+            improved = best is not None
+            while improved:
+                improved = False
+                seq = best
+                moves = (
+                    seq[:i] + (item,) + seq[i + 1:]
+                    for i in range(len(seq)) for item in ingredients
+                )
+                moved = (
+                    rest[:j] + (item,) + rest[j:]
+                    for i in range(len(seq))
+                    for rest in (seq[:i] + seq[i + 1:],)
+                    for j in range(len(seq)) for item in ingredients
+                )
+                for candidate in (*moves, *moved):
+                    check_abort(max_steps)
+                    cand_val = evaluate(candidate)
+                    if cand_val > best_val + 1e-9:
+                        best_val, best, improved = cand_val, candidate, True
+                        break
+
+        initial = self._initial_resources(limits)
+        best_val, best = float("-inf"), None
+        completed = False
+        try:
+            # Startlösung: erst gierig, dann breiter. Auch diese Phase prüft
+            # Timeout/Abbruch; bis dahin Gefundenes bleibt erhalten.
+            for width in (1, 16, 256):
+                val, seq = beam_seed(width)
+                if val > best_val:
+                    best_val, best = val, seq
+            local_search()
+            # Vorwärts: unterschiedliche Zustände mit billigstem Präfix
+            layer: Dict[tuple, tuple] = {(0, ()): (0.0, (), initial)}
+            for depth in range(1, prefix_steps + 1):
+                next_layer: Dict[tuple, tuple] = {}
+                for (mask, _), (cost, seq, res) in layer.items():
+                    check_abort(len(ingredients))
+                    for item in ingredients:
+                        new_res = next_resources(res, item, max_steps - depth)
+                        if new_res is None:
+                            continue
+                        new_cost = cost + prices[item]
+                        key = (step(mask, item),
+                               self._resource_key(limits, new_res,
+                                                  max_steps - depth)
+                               if constrained else ())
+                        known = next_layer.get(key)
+                        if known is None or new_cost < known[0]:
+                            next_layer[key] = (new_cost, seq + (item,), new_res)
+                layer = next_layer
+
+            candidates = sorted(
+                (
+                    (upper_bound(mask, suffix_steps) - cost, idx, mask, cost, seq, res)
+                    for idx, ((mask, _), (cost, seq, res)) in enumerate(layer.items())
+                ),
+                key=lambda c: (-c[0], c[1])
+            )
+
+            # Join: exakter Suffix je Präfix, solange die Schranke reicht
+            for bound, _, mask, cost, seq, res in candidates:
+                if bound <= best_val:
+                    break
+                if suffix_steps == 0:
+                    val, exact, suffix = terminal(mask), True, ()
+                else:
+                    val, exact, suffix = best_suffix(
+                        mask, suffix_steps, res, best_val + cost,
+                        memo_key(mask, suffix_steps, res)
+                    )
+                if exact and val - cost > best_val:
+                    best_val, best = val - cost, seq + suffix
+            completed = True
+        except _SearchAborted:
+            pass
+        self.last_result_exact = completed
+
+        if best is None or best_val == float("-inf"):
+            return [], [], 0.0, float("-inf")
+        best_seq = list(best)
+        best_eff = self.calc.get_combined_effects(best_seq)
+        best_cost = self.calc.calculate_cost(best_seq)
+        best_profit = self.calc.calculate_sale_price(best_eff, base) - best_cost
+        return best_seq, best_eff, best_cost, best_profit
+
+    def _reach_tables(
+        self,
+        ingredients: List[str],
+        rules: Dict[str, Tuple[int, List[Tuple[int, int]]]],
+        multipliers: List[float],
+        max_steps: int
+    ) -> Tuple[List[List[float]], List[float]]:
+        """
+        Tabellen für die Schranke der MITM-Suche.
+
+        Jeder Effekt wird unabhängig betrachtet: reach[j][i] ist der beste
+        Multiplikator, den Effekt i in höchstens j Schritten annehmen kann.
+        Da apply_item die Replacement-Liste einer Zutat der Reihe nach
+        anwendet, kann eine Zutat einen Effekt mehrfach ersetzen (Battery:
+        Electrifying -> Euphoric -> Zombifying); der Nachfolger wird daher
+        über die komplette Liste bestimmt. new_best[j] ist der beste Wert
+        eines neu hinzugekommenen Effekts, j Schritte nach dem Schritt, in
+        dem er entsteht (inklusive der Replacements dieses Schritts).
+        """
+        successors = self._effect_successors(ingredients, rules, len(multipliers))
+        reach: List[List[float]] = [list(multipliers)]
+        for _ in range(max_steps):
+            prev = reach[-1]
+            reach.append([
+                max([prev[i]] + [prev[n] for n in successors[i]])
+                for i in range(len(multipliers))
+            ])
+        added = [_apply_mask(0, rules[item]).bit_length() - 1 for item in ingredients]
+        new_best = [
+            max((reach[j][i] for i in added), default=0.0)
+            for j in range(max_steps + 1)
+        ]
+        return reach, new_best
+
+    def _effect_successors(
+        self,
+        ingredients: List[str],
+        rules: Dict[str, Tuple[int, List[Tuple[int, int]]]],
+        n: int
+    ) -> List[Set[int]]:
+        """
+        successors[i]: Effekte, zu denen Effekt i in einem Schritt werden
+        kann (i selbst, wenn eine Zutat ihn nicht ersetzt).
+        """
+        successors: List[Set[int]] = [set() for _ in range(n)]
+        for item in ingredients:
+            replacements = rules[item][1]
+            for i in range(n):
+                nxt = _apply_mask(1 << i, (0, replacements))
+                successors[i].add(nxt.bit_length() - 1)
+        return successors
+
+    def _effect_pruning(
+        self, ingredients: List[str], max_steps: int, limits: Dict
+    ) -> Optional[Dict]:
+        """
+        Tabellen, mit denen Knoten verworfen werden, deren Effekte die
+        Effekt-Constraints in den restlichen Schritten nicht mehr erfüllen
+        können. None, wenn es nichts zu verwerfen gibt, was nicht ohnehin
+        der Zieltest abdeckt.
+
+        Je gefordertem Effekt r und Restschrittzahl j: sources[j] ist die
+        Bitmaske der Effekte, die in genau j Schritten zu r werden können,
+        addable[j], ob r über den Default-Effekt einer der letzten j Zutaten
+        entstehen kann. Verbotene Effekte, die keine Zutat ersetzt, bleiben
+        für immer (permanent).
+        """
+        if not limits["required"] and not limits["forbidden"]:
+            return None
+        index, rules = self.effect_masks()
+        successors = self._effect_successors(ingredients, rules, len(index))
+        added = {_apply_mask(0, rules[item]) for item in ingredients}
+        required = []
+        for effect in limits["required"]:
+            sources = [1 << index[effect]]
+            for _ in range(max_steps):
+                sources.append(sum(
+                    1 << i for i, succ in enumerate(successors)
+                    if any(sources[-1] >> n & 1 for n in succ)
+                ))
+            addable = [False]
+            for j in range(1, max_steps + 1):
+                addable.append(addable[-1] or any(
+                    bit & sources[j - 1] for bit in added))
+            required.append((sources, addable))
+        permanent = sum(
+            1 << index[effect] for effect in limits["forbidden"]
+            if effect in index and successors[index[effect]] == {index[effect]}
+        )
+        if not required and not permanent:
+            # Verbotene Effekte lassen sich noch ersetzen: nur der Zieltest greift
+            return None
+        forbidden = sum(1 << index[e] for e in limits["forbidden"] if e in index)
+        return {"index": index, "required": required,
+                "permanent": permanent, "forbidden": forbidden}
+
+    def _effects_possible(self, pruning: Dict, mask: int, steps_left: int) -> bool:
+        """
+        False, wenn der Effekt-Zustand mask die Effekt-Constraints nach
+        steps_left weiteren Schritten sicher nicht erfüllt.
+        """
+        forbidden = pruning["permanent"] if steps_left else pruning["forbidden"]
+        if mask & forbidden:
+            return False
+        for sources, addable in pruning["required"]:
+            if not mask & sources[steps_left] and not addable[steps_left]:
+                return False
+        return True
+
+    def _prepare_ingredients(
+        self, allowed_ingredients: Optional[List[str]]
+    ) -> List[str]:
+        """Liefert die für die Suche zu verwendenden Zutaten."""
+        if allowed_ingredients and len(allowed_ingredients) > 0:
+            # Nur erlaubte Zutaten verwenden, die auch im Calculator existieren
+            return [ing for ing in allowed_ingredients
+                    if ing in self.calc.INGREDIENT_PRICES]
+        # Wenn keine Zutaten gewählt wurden, alle verfügbaren verwenden
+        return list(self.calc.INGREDIENT_PRICES.keys())
+
+    def _build_limits(
+        self,
+        ingredients: List[str],
+        max_steps: int,
+        min_addiction: Optional[int],
+        max_addiction: Optional[int],
+        max_cost: Optional[float],
+        max_uses_per_ingredient: Optional[Union[int, Dict[str, int]]],
+        required_effects: Optional[List[str]],
+        forbidden_effects: Optional[List[str]]
+    ) -> Dict:
+        """
+        Bündelt die harten Constraints einer Suche und berechnet die
+        Schranken (billigste Zutat, kleinste/größte Addiction), mit denen
+        beim Expandieren unzulässige Teilsequenzen verworfen werden.
+
+        Die Verwendungen begrenzter Zutaten werden als ein Integer mit einem
+        Bitfeld je Zutat gezählt (siehe _step_resources/_resource_key); das
+        oberste Bit jedes Feldes ist ein Guard-Bit für den feldweisen
+        Vergleich per Subtraktion.
+        """
+        if isinstance(max_uses_per_ingredient, int):
+            max_uses = {ing: max_uses_per_ingredient for ing in ingredients}
+        else:
+            max_uses = dict(max_uses_per_ingredient or {})
+        # Sind alle Zutaten begrenzt, ist die Sequenzlänge durch die Summe beschränkt
+        if all(ing in max_uses for ing in ingredients):
+            max_total_uses = sum(max_uses[ing] for ing in ingredients)
+        else:
+            max_total_uses = math.inf
+        # Gezählt werden nur Zutaten, deren Limit bei max_steps greifen kann
+        capped = [ing for ing in ingredients
+                  if ing in max_uses and max_uses[ing] < max_steps]
+        width = max([max_uses[ing] for ing in capped] + [1]).bit_length() + 1
+        value_mask = (1 << (width - 1)) - 1
+        use_fields = {
+            ing: (slot * width, max_uses[ing], 1 << (slot * width))
+            for slot, ing in enumerate(capped)
+        }
+        use_guard = sum(1 << (slot * width + width - 1) for slot in range(len(capped)))
+        # Je Restschrittzahl t: ab welcher Verwendung (cap - t) das Limit greift
+        use_thresholds = [
+            sum(max(0, max_uses[ing] - t) << shift
+                for ing, (shift, _, _) in use_fields.items())
+            for t in range(max_steps + 1)
+        ]
+
+        prices = [self.calc.INGREDIENT_PRICES[ing] for ing in ingredients]
+        levels = [self.calc.ADDICTION_LEVELS.get(ing, 0) for ing in ingredients]
+
+        # Effekte, die mit diesen Zutaten überhaupt entstehen können
+        producible: Set[str] = set()
+        for ing in ingredients:
+            info = self.calc.items_data[ing]
+            producible.add(info["base_effect"])
+            producible.update(new for _, new in info.get("replacements", []))
+        required = frozenset(required_effects or [])
+        forbidden = frozenset(forbidden_effects or [])
+        return {
+            "min_addiction": min_addiction,
+            "max_addiction": max_addiction,
+            "max_cost": max_cost,
+            "max_total_uses": max_total_uses,
+            "use_fields": use_fields,
+            "use_width": width,
+            "use_value_mask": value_mask,
+            "use_guard": use_guard,
+            "use_thresholds": use_thresholds,
+            "required": required,
+            "forbidden": forbidden,
+            # Mehr als 8 Effekte gibt es nicht, unbekannte Effekte entstehen nie
+            "satisfiable": (required.issubset(producible)
+                            and len(required) <= 8
+                            and required.isdisjoint(forbidden)),
+            "min_price": min(prices, default=0.0),
+            "max_price": max(prices, default=0.0),
+            "min_level": min(levels, default=0),
+            "max_level": max(levels, default=0),
+            "track_cost": max_cost is not None,
+            "track_addiction": (min_addiction is not None
+                                or max_addiction is not None),
+            "constrained": (max_cost is not None or min_addiction is not None
+                            or max_addiction is not None or bool(capped)),
+        }
+
+    def _initial_resources(self, limits: Dict) -> tuple:
+        """Ressourcen der leeren Sequenz: (Kosten, Addiction, Verwendungen als Bitfelder)."""
+        return (0.0, 0, 0)
+
+    def _step_resources(
+        self, limits: Dict, resources: tuple, item: str, steps_left: int
+    ) -> Optional[tuple]:
+        """
+        Ressourcen nach Anhängen von item. None, wenn item laut
+        max_uses_per_ingredient nicht mehr verwendet werden darf oder die
+        Grenzen auch mit den günstigsten verbleibenden Schritten nicht mehr
+        einzuhalten sind.
+        """
+        cost, addiction, uses = resources
+        field = limits["use_fields"].get(item)
+        if field is not None:
+            shift, cap, one = field
+            if (uses >> shift) & limits["use_value_mask"] >= cap:
+                return None
+            uses += one
+        cost += self.calc.INGREDIENT_PRICES[item]
+        addiction += self.calc.ADDICTION_LEVELS.get(item, 0)
+        if self._exceeds_limits(limits, cost, addiction, steps_left):
+            return None
+        return cost, addiction, uses
+
+    def _exceeds_limits(
+        self, limits: Dict, cost: float, addiction: int, steps_left: int
+    ) -> bool:
+        """
+        True, wenn Kosten/Addiction die Grenzen auch mit den günstigsten
+        verbleibenden Schritten nicht mehr einhalten können.
+        """
+        if limits["track_cost"]:
+            if cost + steps_left * limits["min_price"] > limits["max_cost"]:
+                return True
+        if limits["track_addiction"]:
+            if (limits["max_addiction"] is not None and
+                    addiction + steps_left * limits["min_level"]
+                    > limits["max_addiction"]):
+                return True
+            if (limits["min_addiction"] is not None and
+                    addiction + steps_left * limits["max_level"]
+                    < limits["min_addiction"]):
+                return True
+        return False
+
+    def _effects_allowed(self, limits: Dict, effects: Set[str]) -> bool:
+        """Prüft die Effekt-Constraints für ein fertiges Produkt."""
+        return (limits["required"].issubset(effects)
+                and limits["forbidden"].isdisjoint(effects))
+
+    def _resource_key(self, limits: Dict, resources: tuple, steps_left: int) -> tuple:
+        """
+        Pfadabhängiger Anteil eines Suchzustands als Vektor "kleiner ist
+        besser": Kosten, Addiction (bzw. negative Addiction für die
+        Untergrenze) und Verwendungen je begrenzter Zutat.
+
+        Eine Achse zählt nur, solange ihr Limit in den steps_left
+        verbleibenden Schritten noch greifen kann; sonst steht dort -inf,
+        damit Pfade, die sich nur in irrelevanten Ressourcen unterscheiden,
+        zusammenfallen. Ohne Ressourcen-Constraints ist der Vektor leer.
+
+        Die Verwendungen bleiben gepackt: je Feld max(0, used - (cap - t)),
+        was für Knoten gleicher Tiefe dieselbe Ordnung ergibt.
+        Rückgabe: (Tupel der Skalar-Achsen, gepackte Verwendungen).
+        """
+        cost, addiction, uses = resources
+        free = float("-inf")
+        key = []
+        if limits["track_cost"]:
+            binds = cost + steps_left * limits["max_price"] > limits["max_cost"]
+            key.append(cost if binds else free)
+        if limits["track_addiction"]:
+            if limits["max_addiction"] is not None:
+                binds = (addiction + steps_left * limits["max_level"]
+                         > limits["max_addiction"])
+                key.append(addiction if binds else free)
+            if limits["min_addiction"] is not None:
+                binds = (addiction + steps_left * limits["min_level"]
+                         < limits["min_addiction"])
+                key.append(-addiction if binds else free)
+        excess = 0
+        if uses:
+            guard = limits["use_guard"]
+            diff = (uses | guard) - limits["use_thresholds"][steps_left]
+            # Guard-Bit bleibt nur in Feldern mit used >= Schwelle stehen
+            fits = (diff & guard) >> (limits["use_width"] - 1)
+            excess = diff & (fits * limits["use_value_mask"])
+        return tuple(key), excess
+
+    def _dominates(self, limits: Dict, a: tuple, b: tuple) -> bool:
+        """True, wenn Ressourcen-Vektor a auf jeder Achse mindestens so gut ist wie b."""
+        if not all(x <= y for x, y in zip(a[0], b[0])):
+            return False
+        # Feldweise a <= b: kein Feld leiht sich das Guard-Bit
+        guard = limits["use_guard"]
+        return ((b[1] | guard) - a[1]) & guard == guard
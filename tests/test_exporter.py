@@ -0,0 +1,152 @@
+from itertools import product
+
+import pytest
+
+from schedule1.calculator import Calculator
+from schedule1.exporter import CatalogueExporter, read_catalogue
+from schedule1 import search_engine
+from schedule1.search_engine import SearchEngine
+
+
+@pytest.fixture(scope="module")
+def calc():
+    return Calculator()
+
+
+@pytest.fixture(scope="module")
+def exporter(calc):
+    return CatalogueExporter(calc)
+
+
+def _rounded(row):
+    """Zeile so runden, wie sie in der Datei gespeichert wird."""
+    return {
+        **row,
+        "multiplier": round(row["multiplier"], 2),
+        "cost": round(row["cost"], 2),
+        "profit": {b: round(p, 2) for b, p in row["profit"].items()},
+    }
+
+
+def test_effect_numbering_matches_search_masks(exporter):
+    index, _ = exporter.search.effect_masks()
+    assert exporter.effects == sorted(index, key=index.get)
+    assert len(exporter.effects) <= 64
+
+
+def test_too_many_effects_are_rejected(calc, monkeypatch):
+    index = {f"E{i}": i for i in range(65)}
+    monkeypatch.setattr(SearchEngine, "effect_masks", lambda self: (index, {}))
+    with pytest.raises(ValueError):
+        CatalogueExporter(calc)
+
+
+def test_export_round_trip(exporter, tmp_path):
+    path = str(tmp_path / "cat.bin")
+    written = exporter.export(path, 3, chunk_size=1000)
+
+    expected = [_rounded(r) for r in exporter.iter_rows(3)]
+    rows = list(read_catalogue(path))
+    assert written == len(expected) == len(rows)
+    for got, want in zip(rows, expected):
+        assert sorted(got["effects"]) == sorted(want["effects"])
+        assert got["sequence"] == want["sequence"]
+        assert (got["depth"], got["addiction"]) == (want["depth"], want["addiction"])
+        assert got["multiplier"] == pytest.approx(want["multiplier"])
+        assert got["cost"] == pytest.approx(want["cost"])
+        assert got["profit"] == pytest.approx(want["profit"])
+
+
+@pytest.mark.parametrize("max_states_in_memory", [None, 50])
+def test_interrupted_export_resumes_identically(exporter, tmp_path, monkeypatch,
+                                                max_states_in_memory):
+    clean = str(tmp_path / "clean.bin")
+    exporter.export(clean, 3, chunk_size=100)
+
+    path = str(tmp_path / "cat.bin")
+    original = CatalogueExporter._write_chunk
+    calls = []
+
+    def crashing(self, f, rows):
+        calls.append(len(rows))
+        if len(calls) == 3:
+            # Halb geschriebener Chunk, danach Abbruch
+            f.write(b"CHNK\xff\xff garbage")
+            raise KeyboardInterrupt
+        return original(self, f, rows)
+
+    monkeypatch.setattr(CatalogueExporter, "_write_chunk", crashing)
+    with pytest.raises(KeyboardInterrupt):
+        exporter.export(path, 3, chunk_size=100,
+                        max_states_in_memory=max_states_in_memory)
+    monkeypatch.setattr(CatalogueExporter, "_write_chunk", original)
+
+    assert (tmp_path / "cat.bin.ckpt").exists()
+    exporter.export(path, 3, chunk_size=100,
+                    max_states_in_memory=max_states_in_memory)
+    assert not (tmp_path / "cat.bin.ckpt").exists()
+    assert not (tmp_path / "cat.bin.layers").exists()
+    with open(path, "rb") as a, open(clean, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_spilled_enumeration_matches_in_memory(calc):
+    engine = SearchEngine(calc)
+    in_memory = list(engine.iter_reachable_states(4))
+    spilled = list(engine.iter_reachable_states(4, max_states_in_memory=997))
+    assert spilled == in_memory
+
+
+def test_spilled_enumeration_keeps_cheapest_sequence(calc):
+    engine = SearchEngine(calc)
+    allowed = ["Cuke", "Banana", "Battery", "Gasoline"]
+    best = {}
+    for depth, effects, seq in engine.iter_reachable_states(
+            3, allowed, max_states_in_memory=5):
+        key = (depth, frozenset(effects))
+        assert key not in best
+        best[key] = calc.calculate_cost(seq)
+
+    # Gegenprobe per Brute Force
+    for depth in range(1, 4):
+        for seq in product(allowed, repeat=depth):
+            effects = frozenset(calc.get_combined_effects(list(seq)))
+            assert best[(depth, effects)] <= calc.calculate_cost(list(seq))
+
+
+@pytest.mark.parametrize("skip_into_depth", [4, 5])
+def test_resumed_enumeration_starts_at_saved_layer(calc, tmp_path, monkeypatch,
+                                                   skip_into_depth):
+    engine = SearchEngine(calc)
+    full = list(engine.iter_reachable_states(5, max_states_in_memory=997))
+    first = {d: min(i for i, s in enumerate(full) if s[0] == d) for d in (4, 5)}
+    parents = first[5] - first[4]
+
+    # Abbruch mitten in Tiefe 5; Tiefe 4 ist dann vollständig gespeichert
+    work = str(tmp_path / "layers")
+    states = engine.iter_reachable_states(5, max_states_in_memory=997, work_dir=work)
+    for _ in range(len(full) - 100):
+        next(states)
+    states.close()
+
+    calls = []
+    original = search_engine._apply_mask
+
+    def counting(mask, rule):
+        calls.append(mask)
+        return original(mask, rule)
+
+    monkeypatch.setattr(search_engine, "_apply_mask", counting)
+    skip = first[skip_into_depth] + 10
+    resumed = list(engine.iter_reachable_states(
+        5, max_states_in_memory=997, skip=skip, work_dir=work))
+    assert resumed == full[skip:]
+    # Nur Tiefe 5 wird aus der gespeicherten Tiefe 4 neu berechnet
+    assert len(calls) == parents * len(calc.INGREDIENT_PRICES)
+
+
+def test_in_memory_enumeration_skips_rows(calc):
+    engine = SearchEngine(calc)
+    full = list(engine.iter_reachable_states(3))
+    for skip in (0, 5, len(full) - 3, len(full)):
+        assert list(engine.iter_reachable_states(3, skip=skip)) == full[skip:]
@@ -0,0 +1,159 @@
+import itertools
+import time
+from functools import lru_cache
+
+import pytest
+
+from schedule1.calculator import Calculator
+from schedule1.search_engine import SearchEngine, _apply_mask
+
+CALC = Calculator()
+ENGINE = SearchEngine(CALC)
+INGREDIENTS = list(CALC.INGREDIENT_PRICES)
+
+CONSTRAINTS = [
+    {},
+    {"min_addiction": 14},
+    {"max_addiction": 9},
+    {"max_cost": 13},
+    {"max_uses_per_ingredient": 1},
+    {"max_uses_per_ingredient": {"Cuke": 0, "Banana": 1}},
+    {"required_effects": ["Energizing"]},
+    {"forbidden_effects": ["Toxic", "Sedating"]},
+    {"required_effects": ["Zombifying"], "forbidden_effects": ["Bright-Eyed"]},
+]
+
+
+@lru_cache(maxsize=None)
+def all_sequences(depth, allowed=None):
+    """Alle Sequenzen der Länge depth mit (Effekte, Kosten, Addiction)."""
+    rows = []
+    for seq in itertools.product(allowed or INGREDIENTS, repeat=depth):
+        seq = list(seq)
+        rows.append((seq, set(CALC.get_combined_effects(seq)),
+                     CALC.calculate_cost(seq), CALC.calculate_addiction(seq)))
+    return rows
+
+
+def feasible(seq, effects, cost, addiction, constraints):
+    if cost > constraints.get("max_cost", float("inf")):
+        return False
+    if not constraints.get("min_addiction", 0) <= addiction <= \
+            constraints.get("max_addiction", float("inf")):
+        return False
+    caps = constraints.get("max_uses_per_ingredient")
+    if isinstance(caps, int):
+        caps = {ing: caps for ing in INGREDIENTS}
+    if caps and any(seq.count(ing) > cap for ing, cap in caps.items()):
+        return False
+    if not set(constraints.get("required_effects", [])) <= effects:
+        return False
+    return not set(constraints.get("forbidden_effects", [])) & effects
+
+
+def score(effects, cost, optimize_for, desired, base):
+    bonus = 10.0 * sum(1 for e in desired if e in effects)
+    if optimize_for == "cost":
+        return bonus - cost
+    return CALC.calculate_sale_price(list(effects), base) + bonus - cost
+
+
+def brute_force(depth, optimize_for, desired, constraints, allowed=None, base="Meth"):
+    return max(
+        (score(effects, cost, optimize_for, desired, base)
+         for seq, effects, cost, addiction in all_sequences(depth, allowed)
+         if feasible(seq, effects, cost, addiction, constraints)),
+        default=float("-inf")
+    )
+
+
+def mitm_score(depth, optimize_for, desired, constraints, allowed=None, base="Meth"):
+    seq, effects, cost, _ = ENGINE.find_sequence(
+        list(desired), optimize_for=optimize_for, base=base, max_steps=depth,
+        allowed_ingredients=allowed, mode="mitm", timeout=600, **constraints
+    )
+    if not seq:
+        return float("-inf")
+    assert len(seq) == depth
+    assert feasible(seq, set(effects), cost, CALC.calculate_addiction(seq), constraints)
+    return score(set(effects), cost, optimize_for, desired, base)
+
+
+@pytest.mark.parametrize("constraints", CONSTRAINTS)
+@pytest.mark.parametrize("desired", [(), ("Foggy", "Spicy")])
+@pytest.mark.parametrize("optimize_for", ["profit", "cost"])
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_mitm_matches_exhaustive_search(depth, optimize_for, desired, constraints):
+    expected = brute_force(depth, optimize_for, desired, constraints)
+    assert mitm_score(depth, optimize_for, desired, constraints) == pytest.approx(expected)
+    assert ENGINE.last_result_exact
+
+
+@pytest.mark.parametrize("allowed", [
+    ("Battery", "Cuke", "Mega Bean"),
+    ("Gasoline", "Iodine", "Banana"),
+    ("Battery", "Gasoline", "Iodine", "Donut"),
+])
+@pytest.mark.parametrize("base", ["Weed", "Cocaine"])
+def test_mitm_matches_exhaustive_search_with_chained_replacements(allowed, base):
+    for depth in range(1, 6):
+        expected = brute_force(depth, "profit", (), {}, allowed, base)
+        assert mitm_score(depth, "profit", (), {}, list(allowed), base) == \
+            pytest.approx(expected)
+
+
+def _tables(max_steps):
+    index, rules = ENGINE.effect_masks()
+    multipliers = [CALC.EFFECT_MULTIPLIERS.get(e, 0.0) for e in index]
+    reach, new_best = ENGINE._reach_tables(INGREDIENTS, rules, multipliers, max_steps)
+    return index, rules, multipliers, reach, new_best
+
+
+def test_reach_tables_follow_chained_replacements():
+    index, _, _, reach, _ = _tables(1)
+    # Battery: Electrifying -> Euphoric -> Zombifying in einem Schritt
+    assert reach[1][index["Electrifying"]] >= CALC.EFFECT_MULTIPLIERS["Zombifying"]
+    # Gasoline: Jennerising -> Sneaky -> Tropic Thunder in einem Schritt
+    assert reach[1][index["Jennerising"]] >= CALC.EFFECT_MULTIPLIERS["Tropic Thunder"]
+
+
+def test_reach_tables_bound_every_two_step_trajectory():
+    index, rules, multipliers, reach, new_best = _tables(2)
+
+    def follow(effect_bit, items):
+        for item in items:
+            effect_bit = _apply_mask(effect_bit, (0, rules[item][1]))
+        return multipliers[effect_bit.bit_length() - 1]
+
+    for i in range(len(multipliers)):
+        for items in itertools.product(INGREDIENTS, repeat=2):
+            assert follow(1 << i, items[:1]) <= reach[1][i]
+            assert follow(1 << i, items) <= reach[2][i]
+    for items in itertools.product(INGREDIENTS, repeat=2):
+        added = _apply_mask(0, rules[items[0]])
+        assert multipliers[added.bit_length() - 1] <= new_best[0]
+        assert follow(added, items[1:]) <= new_best[1]
+
+
+def test_timeout_reports_heuristic_result():
+    seq, _, _, _ = ENGINE.find_sequence([], max_steps=12, mode="mitm", timeout=0.5)
+    assert len(seq) == 12
+    assert ENGINE.last_result_exact is False
+
+
+@pytest.mark.parametrize("constraints", [
+    {},
+    {"max_uses_per_ingredient": 3, "max_addiction": 80, "required_effects": ["Zombifying"]},
+])
+def test_timeout_covers_start_solution(constraints):
+    start = time.perf_counter()
+    ENGINE.find_sequence([], max_steps=15, mode="mitm", timeout=0.1, **constraints)
+    assert time.perf_counter() - start < 0.3
+    assert ENGINE.last_result_exact is False
+
+
+def test_abort_callback_covers_start_solution():
+    start = time.perf_counter()
+    ENGINE.find_sequence([], max_steps=15, mode="mitm", abort_callback=lambda: True)
+    assert time.perf_counter() - start < 0.3
+    assert ENGINE.last_result_exact is False
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from schedule1.open_list import DEPTH_SLOTS, OPEN_LISTS, scale_priority
+from schedule1.search_engine import SearchEngine
+from schedule1.calculator import Calculator
+from bench_open_list import baseline_find_sequence
+
+
+def _random_entries(n=3000):
+    rng = random.Random(1)
+    return [(rng.randrange(-300, 300) / 50, float(rng.randrange(0, 4)),
+             rng.randrange(0, 6), i) for i in range(n)]
+
+
+def test_heap_pops_in_f_then_g_then_item_order():
+    entries = _random_entries()
+    queue = OPEN_LISTS["heap"]()
+    for f, g, depth, i in entries:
+        queue.push(f, g, depth, (i, "x"))
+    assert len(queue) == len(entries)
+
+    popped = [queue.pop() for _ in range(len(entries))]
+    # Die Tiefe geht nicht in den Schlüssel ein
+    expected = sorted(entries, key=lambda e: (e[0], e[1], e[3]))
+    assert popped == [(i, "x") for _, _, _, i in expected]
+    assert len(queue) == 0
+
+
+def test_bucket_pops_in_priority_then_deeper_then_lifo_order():
+    entries = _random_entries()
+    queue = OPEN_LISTS["bucket"](6)
+    for f, g, depth, i in entries:
+        queue.push(f, g, depth, i)
+    assert len(queue) == len(entries)
+
+    popped = [queue.pop() for _ in range(len(entries))]
+    expected = sorted(entries, key=lambda e: (scale_priority(e[0]), -e[2], -e[3]))
+    assert popped == [i for _, _, _, i in expected]
+    assert len(queue) == 0
+
+
+def test_bucket_interleaved_push_below_current_minimum():
+    queue = OPEN_LISTS["bucket"]()
+    queue.push(10.0, 0.0, 1, "a")
+    queue.push(12.0, 0.0, 1, "b")
+    assert queue.pop() == "a"
+    queue.push(-5.0, 0.0, 1, "c")
+    queue.push(-5.0, 0.0, 2, "d")
+    queue.push(11.0, 0.0, 1, "e")
+    assert [queue.pop() for _ in range(4)] == ["d", "c", "e", "b"]
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_bucket_depth_out_of_range_is_rejected():
+    queue = OPEN_LISTS["bucket"](4)
+    with pytest.raises(ValueError):
+        queue.push(0.0, 0.0, 4, None)
+    with pytest.raises(ValueError):
+        queue.push(0.0, 0.0, -1, None)
+    with pytest.raises(ValueError):
+        OPEN_LISTS["bucket"](DEPTH_SLOTS + 1)
+
+
+def test_find_sequence_rejects_too_many_steps_for_bucket():
+    engine = SearchEngine(Calculator())
+    with pytest.raises(ValueError):
+        engine.find_sequence([], max_steps=DEPTH_SLOTS, open_list="bucket")
+
+
+def test_scale_priority_is_exact_for_price_steps():
+    assert scale_priority(-123.46) == -6173
+    assert scale_priority(0.02 * 7) == 7
+
+
+@pytest.mark.parametrize("max_steps", [3, 4, 5])
+def test_heap_matches_original_search(max_steps):
+    calc = Calculator()
+    seq, _, _, _ = SearchEngine(calc).find_sequence([], max_steps=max_steps)
+    assert seq == baseline_find_sequence(calc, max_steps)
+
+
+@pytest.mark.parametrize("optimize_for", ["profit", "cost"])
+def test_open_lists_find_equally_good_sequences(optimize_for):
+    engine = SearchEngine(Calculator())
+    results = {
+        name: engine.find_sequence([], optimize_for=optimize_for,
+                                   max_steps=4, open_list=name)
+        for name in OPEN_LISTS
+    }
+    # Gleichstände dürfen verschieden aufgelöst werden, der Wert nicht
+    if optimize_for == "profit":
+        values = {round(profit, 2) for _, _, _, profit in results.values()}
+    else:
+        values = {round(cost, 2) for _, _, cost, _ in results.values()}
+    assert len(values) == 1
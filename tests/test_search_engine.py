@@ -0,0 +1,171 @@
+import time
+from itertools import product
+
+import pytest
+
+from schedule1.calculator import Calculator
+from schedule1.search_engine import SearchEngine
+
+
+@pytest.fixture(scope="module")
+def calc():
+    return Calculator()
+
+
+@pytest.fixture(scope="module")
+def engine(calc):
+    return SearchEngine(calc)
+
+
+def test_max_cost_is_respected(engine, calc):
+    seq, _, cost, _ = engine.find_sequence([], max_steps=4, max_cost=12)
+    assert len(seq) == 4
+    assert cost <= 12
+    assert calc.calculate_cost(seq) == cost
+
+
+def test_addiction_bounds_are_respected(engine, calc):
+    seq, _, _, _ = engine.find_sequence([], max_steps=4, max_addiction=8)
+    assert seq and calc.calculate_addiction(seq) <= 8
+
+    seq, _, _, _ = engine.find_sequence([], max_steps=4, min_addiction=35)
+    assert seq and calc.calculate_addiction(seq) >= 35
+
+
+def test_max_uses_per_ingredient(engine):
+    seq, _, _, _ = engine.find_sequence([], max_steps=5, max_uses_per_ingredient=1)
+    assert len(seq) == 5 and len(set(seq)) == 5
+
+    seq, _, _, _ = engine.find_sequence(
+        [], max_steps=3, allowed_ingredients=["Cuke", "Banana"],
+        max_uses_per_ingredient={"Cuke": 1}
+    )
+    assert seq.count("Cuke") <= 1
+
+
+def test_required_and_forbidden_effects(engine):
+    _, effects, _, _ = engine.find_sequence(
+        [], max_steps=3, required_effects=["Energizing"], forbidden_effects=["Toxic"]
+    )
+    assert "Energizing" in effects
+    assert "Toxic" not in effects
+
+
+@pytest.mark.parametrize("required, forbidden", [
+    (["Zombifying"], []),
+    (["Zombifying", "Foggy"], ["Bright-Eyed"]),
+    ([], ["Zombifying"]),
+    (["Shrinking"], ["Toxic"]),
+])
+def test_effect_pruning_never_drops_feasible_prefixes(engine, calc, required, forbidden):
+    ingredients = engine._prepare_ingredients(None)
+    depth = 3
+    limits = engine._build_limits(
+        ingredients, depth, None, None, None, None, required, forbidden
+    )
+    pruning = engine._effect_pruning(ingredients, depth, limits)
+    assert pruning is not None
+    index = pruning["index"]
+    for seq in product(ingredients, repeat=depth):
+        if not engine._effects_allowed(limits, set(calc.get_combined_effects(list(seq)))):
+            continue
+        effects = set()
+        for i, item in enumerate(seq):
+            effects = calc.apply_item(effects, item)
+            mask = sum(1 << index[e] for e in effects)
+            assert engine._effects_possible(pruning, mask, depth - i - 1), seq
+
+
+def test_effect_pruning_without_permanent_effects_is_skipped(engine):
+    ingredients = engine._prepare_ingredients(None)
+    limits = engine._build_limits(
+        ingredients, 4, None, None, None, None, None, ["Toxic"]
+    )
+    assert engine._effect_pruning(ingredients, 4, limits) is None
+
+
+def test_non_binding_limits_do_not_change_result(engine):
+    plain = engine.find_sequence([], max_steps=4)
+    limited = engine.find_sequence(
+        [], max_steps=4, max_cost=1000, max_addiction=1000, max_uses_per_ingredient=4
+    )
+    assert limited == plain
+
+
+def test_infeasible_limits_return_empty(engine):
+    # Die billigste Zutat kostet 2 -> 3 Schritte kosten mindestens 6
+    assert engine.find_sequence([], max_steps=3, max_cost=5)[0] == []
+    assert engine.find_sequence([], max_steps=2, max_uses_per_ingredient=0)[0] == []
+
+
+@pytest.mark.parametrize("mode", ["astar", "mitm"])
+@pytest.mark.parametrize("kwargs", [
+    {"required_effects": ["Nope"]},
+    {"required_effects": sorted(Calculator.EFFECT_MULTIPLIERS)[:9]},
+    {"required_effects": ["Spicy"], "forbidden_effects": ["Spicy"]},
+    {"required_effects": ["Zombifying"], "allowed_ingredients": ["Cuke"]},
+    {"max_uses_per_ingredient": 3, "allowed_ingredients": ["Cuke", "Banana"]},
+])
+def test_unsatisfiable_effects_return_immediately(engine, mode, kwargs):
+    start = time.time()
+    result = engine.find_sequence([], max_steps=7, mode=mode, **kwargs)
+    assert result == ([], [], 0.0, float("-inf"))
+    assert time.time() - start < 1.0
+
+
+def test_resource_key_ignores_limits_that_cannot_bind(engine):
+    limits = engine._build_limits(
+        engine._prepare_ingredients(None), 3, None, None, 100.0, None, None, None
+    )
+    cuke = engine._step_resources(limits, engine._initial_resources(limits), "Cuke", 2)
+    addy = engine._step_resources(limits, engine._initial_resources(limits), "Addy", 2)
+    # 2 Schritte à max. 9 passen immer unter 100 -> Kosten spielen keine Rolle
+    assert engine._resource_key(limits, cuke, 2) == engine._resource_key(limits, addy, 2)
+    limits["max_cost"] = 20.0
+    assert engine._resource_key(limits, cuke, 2) != engine._resource_key(limits, addy, 2)
+
+
+def test_running_resources_match_sequence(engine, calc):
+    limits = engine._build_limits(
+        engine._prepare_ingredients(None), 6, None, 500, 500.0, 3, None, None
+    )
+    seq = ["Cuke", "Addy", "Cuke", "Battery", "Cuke"]
+    resources = engine._initial_resources(limits)
+    for i, item in enumerate(seq):
+        resources = engine._step_resources(limits, resources, item, 6 - i - 1)
+    cost, addiction, _ = resources
+    assert cost == calc.calculate_cost(seq)
+    assert addiction == calc.calculate_addiction(seq)
+    # Cuke ist ausgeschöpft, Addy nicht
+    assert engine._step_resources(limits, resources, "Cuke", 0) is None
+    assert engine._step_resources(limits, resources, "Addy", 0) is not None
+
+
+@pytest.mark.parametrize("cap", [1, 2, 3, 5])
+def test_packed_use_dominance_matches_per_ingredient_counts(engine, cap):
+    ingredients = ["Cuke", "Banana", "Addy"]
+    limits = engine._build_limits(ingredients, 6, None, None, None, cap, None, None)
+    paths = [p for p in product(ingredients, repeat=3)
+             if all(p.count(i) <= cap for i in ingredients)]
+
+    def resources(path):
+        res = engine._initial_resources(limits)
+        for i, item in enumerate(path):
+            res = engine._step_resources(limits, res, item, 6 - i - 1)
+        return res
+
+    for steps_left in range(4):
+        for a in paths:
+            for b in paths:
+                # Erwartung: a ist mindestens so gut wie b, wenn a bei jeder
+                # noch begrenzenden Zutat höchstens so oft verwendet wurde
+                expected = all(
+                    a.count(i) <= b.count(i) or a.count(i) + steps_left <= cap
+                    for i in ingredients
+                )
+                got = engine._dominates(
+                    limits,
+                    engine._resource_key(limits, resources(a), steps_left),
+                    engine._resource_key(limits, resources(b), steps_left),
+                )
+                assert got == expected, (a, b, steps_left)